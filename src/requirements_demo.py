@@ -34,25 +34,48 @@ python requirements_demo.py --kb KNOWLEDGE_BASE_ID
 """
 
 import os
+import argparse
+import asyncio
 import logging
+import contextlib
+import contextvars
+import functools
+import hashlib
 import json
-import boto3
-from botocore.exceptions import ClientError
-from strands import Agent, tool
-from strands_tools import handoff_to_user
+import math
+import queue
+import shelve
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait as wait_for_futures
+try:
+    import orjson
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+except ImportError:
+    _json_dumps = json.dumps
+    _json_loads = json.loads
 from rich.console import Console
 from rich.panel import Panel
 from rich.text import Text
-from rich.progress import Progress, BarColumn, TextColumn, SpinnerColumn
-from rich.table import Table
+from rich.markup import escape
 import sys
 import time
+from dataclasses import dataclass, field
 from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
 import traceback
 import re
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+# Configure logging; quiet by default, set REQ_DEMO_LOG=INFO (or DEBUG) for more detail.
+# Unknown level names fall back to WARNING rather than failing at import.
+LOG_LEVEL = os.environ.get("REQ_DEMO_LOG", "WARNING").upper()
+if not isinstance(logging.getLevelName(LOG_LEVEL), int):
+    LOG_LEVEL = "WARNING"
+logging.basicConfig(
+    level=LOG_LEVEL,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
 logger = logging.getLogger(__name__)
 
 # Initialize console for rich output
@@ -62,19 +85,212 @@ console = Console()
 AWS_REGION = os.environ.get("AWS_REGION", "ap-southeast-2")
 KNOWLEDGE_BASE_ID = os.environ.get("KNOWLEDGE_BASE_ID", "I3RO432NC8")  # Default KB ID
 
-# Global variables for tracking progress
-SECTIONS = [
-    "PROJECT SCOPE",
-    "USER STORIES",
-    "TECHNICAL CONSTRAINTS",
-    "SUCCESS CRITERIA",
-    "FILE FORMAT SUPPORT"
-]
-current_section = 0
-responses = {}
-
-# Define specialized agent tools
-@tool
+# Shared client settings: adaptive retries and pooled keep-alive connections
+BEDROCK_CLIENT_SETTINGS = {
+    'retries': {'mode': 'adaptive'},
+    'tcp_keepalive': True,
+    'max_pool_connections': 32
+}
+
+# Requirements storage: documents go to S3 when a bucket is configured, DynamoDB keeps the metadata
+REQUIREMENTS_TABLE = os.environ.get("REQUIREMENTS_TABLE", "RequirementsDocuments")
+REQUIREMENTS_BUCKET = os.environ.get("REQUIREMENTS_BUCKET")
+
+# Model settings. Latency-optimized inference is only offered for some models and
+# regions, so it is opt-in and needs a supporting model ID.
+BEDROCK_MODEL_ID = os.environ.get("BEDROCK_MODEL_ID")
+BEDROCK_LATENCY_OPTIMIZED = os.environ.get("BEDROCK_LATENCY_OPTIMIZED", "0") == "1"
+
+# Responses with fewer words than this get a fixed low score without an LLM evaluation
+MIN_EVALUATED_WORDS = 5
+SHORT_RESPONSE_SCORE = 2.0
+
+# Set REQ_DEMO_SKIP_LLM_EVAL=1 to score responses locally from their length and section
+# vocabulary instead of with the evaluation agent. Keyword counts are easy to game, so
+# long responses that use enough of the vocabulary score well without being read.
+CHEAP_SCORE_MIN_WORDS = 50
+CHEAP_SCORE_MIN_KEYWORDS = 3
+CHEAP_SCORE = 8.5
+SKIP_LLM_EVAL = os.environ.get("REQ_DEMO_SKIP_LLM_EVAL", "0") == "1"
+
+# Start each section's validation alongside its evaluation instead of after a low score.
+# Weak sections finish sooner, but every section pays for a validation call, so it is opt-in.
+SPECULATIVE_VALIDATION = os.environ.get("REQ_DEMO_SPECULATIVE_VALIDATION", "0") == "1"
+
+# Response caching: exact matches, plus near matches by embedding similarity with
+# SEMANTIC_CACHE=1. That tier costs an embedding call on every miss, so it is opt-in.
+CACHE_DIR = os.environ.get("REQUIREMENTS_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "hitl"))
+SEMANTIC_CACHE_ENABLED = os.environ.get("SEMANTIC_CACHE", "0") == "1"
+SEMANTIC_CACHE_THRESHOLD = 0.92
+EMBEDDING_MODEL_ID = os.environ.get("EMBEDDING_MODEL_ID", "amazon.titan-embed-text-v2:0")
+KB_CACHE_TTL = 24 * 60 * 60  # seconds; knowledge base content can change
+TOOL_CACHE_THRESHOLD = 0.95
+TOOL_CACHE_TTL = 7 * 24 * 60 * 60  # seconds; prompts and models change between releases
+SEMANTIC_TOOL_CACHE = os.environ.get("SEMANTIC_TOOL_CACHE", "0") == "1"
+CACHE_MAX_ENTRIES = 1000  # per cache; the oldest entries are dropped beyond this
+
+# Knowledge base queries shorter than this are answered without a retrieval
+MIN_KB_QUERY_CHARS = 3
+NO_KB_RESULTS = "No information found in the knowledge base for this query."
+
+@dataclass(frozen=True, slots=True)
+class Section:
+    """One requirements section: its position, title, and the text used to ask about it."""
+    idx: int
+    title: str
+    topic: str  # lowercase title, for use inside sentences
+    summary: str
+    question: str
+
+# The sections gathered, in order
+SECTIONS = (
+    Section(0, "PROJECT SCOPE", "project scope",
+            "Project objectives, goals, scope",
+            "What are the main objectives, goals, and scope of this project?"),
+    Section(1, "USER STORIES", "user stories",
+            "User stories, use cases, workflows",
+            "What are the key user stories, use cases, and workflows for this project?"),
+    Section(2, "TECHNICAL CONSTRAINTS", "technical constraints",
+            "Technical requirements, platforms, limitations",
+            "What technical constraints, platform requirements, and limitations should be considered?"),
+    Section(3, "SUCCESS CRITERIA", "success criteria",
+            "Success metrics and acceptance criteria",
+            "What are the success criteria and acceptance metrics for this project?"),
+    Section(4, "FILE FORMAT SUPPORT", "file format support",
+            "Required file formats and data specifications",
+            "What file formats and data specifications need to be supported by this project?"),
+)
+SECTION_TITLES = tuple(section.title for section in SECTIONS)
+
+# "SECTION NAME:" headers at the start of a line in the agent's categorization of additional
+# information, allowing for quoting, bold, bullet, heading and blockquote markers around them
+_HEADER_RE = re.compile(
+    rf"^([ \t\"*\-#>]*)({'|'.join(re.escape(title) for title in SECTION_TITLES)})[*\"]*:[*\"]*",
+    re.MULTILINE
+)
+
+def split_categorized_info(text):
+    """
+    Split categorized text into (section, content) pairs in a single scan over its headers.
+
+    Content is stripped, including the closing quote of a quoted entry.
+    """
+    headers = list(_HEADER_RE.finditer(text))
+    ends = [header.start() for header in headers[1:]] + [len(text)]
+    pairs = []
+    for header, end in zip(headers, ends):
+        content = text[header.end():end].strip()
+        if '"' in header.group(1) and content.endswith('"'):
+            content = content[:-1].rstrip()
+        pairs.append((header.group(2), content))
+    return pairs
+
+_SECTION_LIST = "\n".join(f"{section.idx + 1}. {section.title}: {section.summary}" for section in SECTIONS)
+
+# Main agent system prompt; only the project name and knowledge base block vary per run
+SYSTEM_PROMPT_TEMPLATE = f"""You are a requirements gathering assistant for project: {{project_name}}
+
+Your task is to collect requirements through these {len(SECTIONS)} specific sections:
+{_SECTION_LIST}
+
+Follow this exact process:
+1. Ask ONE specific question for each section, one at a time
+2. Use handoff_to_user to collect the user's response for each question
+3. After collecting all {len(SECTIONS)} responses, ask if the user wants to add anything else to any section
+4. If yes, collect additional input using handoff_to_user
+5. After collecting all information, use evaluate_confidence tool to assess each section
+6. For sections with low confidence, use validate_response tool to identify issues
+7. Use generate_requirements_doc tool to create a Markdown requirements document
+8. Ask the user to review the document before saving
+
+{{kb}}
+
+Be direct and concise in your questions. For each section, ask a focused question that will help gather comprehensive information.
+"""
+
+# Recognized answers to the yes/no prompts, compared after lowercasing
+NEGATIVE_ANSWERS = frozenset({"no", "n", "none", ""})
+APPROVAL_ANSWERS = NEGATIVE_ANSWERS | {"looks good", "approved"}
+AFFIRMATIVE_ANSWERS = frozenset({"yes", "y", "sure", "ok"})
+
+@dataclass
+class RequirementsSession:
+    """The state of one requirements gathering run, so separate runs don't share progress."""
+    project_name: str = ""
+    current_section: int = 0
+    responses: dict = field(default_factory=dict)
+    # Section progress table and its status cells, built on first display
+    progress_table: tuple | None = field(default=None, repr=False)
+
+# System prompts for the specialist agents. They are static so one agent per role can be
+# reused; the section or project being worked on is named in each request instead.
+SPECIALIST_PROMPTS = {
+    "evaluate": """You are an expert requirements analyst evaluating the quality of a response for a requirements section.
+The section is named at the start of each request.
+Analyze the response for:
+1. Relevance - Does it address the section's requirements?
+2. Completeness - Does it provide sufficient information?
+3. Quality - Is the information specific, clear, and actionable?
+
+Provide:
+1. A confidence score from 0-10 based on relevance and quality (NOT length)
+2. 2-3 key strengths
+3. 2-3 areas for improvement
+
+Format your response with "Confidence Score: X/10" on the first line.
+Focus on content quality, not quantity. Be concise.""",
+    "validate": """You are an expert requirements validator identifying gaps in the requirements for a section.
+The section is named at the start of each request.
+Analyze for:
+1. Missing critical information
+2. Ambiguities or vague statements
+3. Non-measurable requirements
+
+Provide a list of 2-3 specific issues found. Be concise and actionable.
+Format your response as a numbered list.""",
+    "document": """You are a requirements document generator. The project is named at the start of each request.
+Create a professional Markdown-formatted requirements document based on the collected information.
+Include all sections with clear headings, bullet points for clarity, and proper formatting.
+Be comprehensive but concise. Include an executive summary at the beginning.
+Focus only on creating a requirements document. Do not include any code or implementation details."""
+}
+
+# Idle specialist agents by role. An agent handles one request at a time, so each request
+# borrows one; the pool only grows to the number of requests that overlap.
+_idle_specialist_agents = {role: queue.SimpleQueue() for role in SPECIALIST_PROMPTS}
+
+@contextlib.contextmanager
+def borrow_specialist_agent(role):
+    """
+    Lend out an idle agent for a specialist role, building one only if all are busy.
+
+    Streaming output is off so parallel responses don't interleave on screen.
+    """
+    idle_agents = _idle_specialist_agents[role]
+    try:
+        agent = idle_agents.get_nowait()
+    except queue.Empty:
+        from strands import Agent
+        agent = Agent(model=get_bedrock_model(), system_prompt=SPECIALIST_PROMPTS[role], callback_handler=None)
+    try:
+        yield agent
+    finally:
+        idle_agents.put(agent)
+
+def ask_specialist(role, prompt):
+    """Send one self-contained request to a specialist agent."""
+    with borrow_specialist_agent(role) as agent:
+        # Each request stands alone; don't carry earlier sections' turns into this one
+        agent.messages.clear()
+        return agent(prompt)
+
+@functools.lru_cache(maxsize=None)
+def get_executor(name):
+    """Return the long-lived worker pool for one kind of section work, creating it once."""
+    return ThreadPoolExecutor(max_workers=len(SECTIONS), thread_name_prefix=name)
+
+# Define specialized agent tools. They are wrapped as Strands tools by specialist_tools(),
+# so importing this module doesn't load strands.
 def evaluate_confidence(response: str, section_name: str) -> str:
     """
     Evaluates the confidence level of a user's response for a requirements section.
@@ -86,36 +302,56 @@ def evaluate_confidence(response: str, section_name: str) -> str:
     Returns:
         Evaluation with confidence score, strengths, and areas for improvement
     """
+    # A response this short can't score well; skip the evaluation agent entirely
+    if len(response.split()) < MIN_EVALUATED_WORDS:
+        return (f"Confidence Score: {SHORT_RESPONSE_SCORE}/10\n\n"
+                "Strengths:\n- None identified\n\n"
+                f"Areas for improvement:\n- The {section_name} response is too short to assess; add specific details")
+
+    # Score locally when LLM evaluation is turned off
+    if SKIP_LLM_EVAL:
+        cheap_score, matched_keywords = _cheap_score(response, section_name)
+        return (f"Confidence Score: {cheap_score:.1f}/10\n\n"
+                f"Strengths:\n- Covers {matched_keywords} key {section_name} topics\n\n"
+                "Areas for improvement:\n- Scored locally; review the details before finalizing")
+
+    # Reuse the evaluation of an identical or near-identical earlier response
+    cache = get_tool_cache("evaluate_confidence", "evaluate")
+    cached_evaluation = cache.get(response, partition=section_name)
+    if cached_evaluation is not None:
+        return cached_evaluation
+
     try:
         console.print(f"[cyan]Analyzing response quality for {section_name}...[/cyan]")
         
-        # Create a specialized agent for evaluation
-        eval_agent = Agent(
-            system_prompt=f"""You are an expert requirements analyst evaluating the quality of a response for '{section_name}'.
-Analyze the response for:
-1. Relevance - Does it address the '{section_name}' requirements?
-2. Completeness - Does it provide sufficient information?
-3. Quality - Is the information specific, clear, and actionable?
-
-Provide:
-1. A confidence score from 0-10 based on relevance and quality (NOT length)
-2. 2-3 key strengths
-3. 2-3 areas for improvement
-
-Format your response with "Confidence Score: X/10" on the first line.
-Focus on content quality, not quantity. Be concise."""
-        )
-        
-        # Call the agent to evaluate the response
-        evaluation = eval_agent(f"Evaluate this {section_name} response: {response}")
+        # Call the shared evaluation agent; the section is named in the message
+        evaluation = ask_specialist("evaluate", f"Section: {section_name}\nEvaluate this {section_name} response: {response}")
         
         console.print(f"[green]Analysis complete.[/green]")
+        cache.put(response, str(evaluation), partition=section_name)
         return str(evaluation)
     except Exception as e:
         console.print(f"[yellow]Error in evaluation: {str(e)}. Using default confidence score.[/yellow]")
         return f"Confidence Score: 7.0/10\n\nError occurred during evaluation: {str(e)}"
 
-@tool
+# Set while running tool calls whose output may be discarded, such as speculative validations.
+# Strands runs direct tool calls on a thread of its own but carries the caller's context to
+# it, so this is a context variable rather than a thread-local.
+_tool_output_quiet = contextvars.ContextVar("tool_output_quiet", default=False)
+
+def tool_print(message):
+    """Print a tool's progress message unless the current context's output is suppressed."""
+    if not _tool_output_quiet.get():
+        console.print(message)
+
+def run_quietly(func, *args, **kwargs):
+    """Call func with tool progress messages suppressed, including in tools it calls."""
+    token = _tool_output_quiet.set(True)
+    try:
+        return func(*args, **kwargs)
+    finally:
+        _tool_output_quiet.reset(token)
+
 def validate_response(response: str, section_name: str) -> str:
     """
     Validates a user's response for a requirements section and identifies specific issues.
@@ -127,31 +363,27 @@ def validate_response(response: str, section_name: str) -> str:
     Returns:
         List of issues found in the response
     """
-    try:
-        console.print(f"[cyan]Validating response for {section_name}...[/cyan]")
-        
-        # Create a specialized agent for validation
-        validation_agent = Agent(
-            system_prompt=f"""You are an expert requirements validator identifying gaps in '{section_name}' requirements.
-Analyze for:
-1. Missing critical information
-2. Ambiguities or vague statements
-3. Non-measurable requirements
+    if not response.strip():
+        return f"1. No information was provided for {section_name}."
 
-Provide a list of 2-3 specific issues found. Be concise and actionable.
-Format your response as a numbered list."""
-        )
+    cache = get_tool_cache("validate_response", "validate")
+    cached_validation = cache.get(response, partition=section_name)
+    if cached_validation is not None:
+        return cached_validation
+
+    try:
+        tool_print(f"[cyan]Validating response for {section_name}...[/cyan]")
         
-        # Call the agent to validate the response
-        validation = validation_agent(f"Identify issues in this {section_name} response: {response}")
+        # Call the shared validation agent; the section is named in the message
+        validation = ask_specialist("validate", f"Section: {section_name}\nIdentify issues in this {section_name} response: {response}")
         
-        console.print(f"[green]Validation complete.[/green]")
+        tool_print(f"[green]Validation complete.[/green]")
+        cache.put(response, str(validation), partition=section_name)
         return str(validation)
     except Exception as e:
-        console.print(f"[yellow]Error in validation: {str(e)}. No issues to report.[/yellow]")
+        tool_print(f"[yellow]Error in validation: {str(e)}. No issues to report.[/yellow]")
         return f"No critical issues found.\n\nError occurred during validation: {str(e)}"
 
-@tool
 def generate_requirements_doc(project_name: str, requirements_data: str) -> str:
     """
     Generate a requirements document in Markdown format.
@@ -163,90 +395,428 @@ def generate_requirements_doc(project_name: str, requirements_data: str) -> str:
     Returns:
         Markdown formatted requirements document
     """
+    cache = get_tool_cache("generate_requirements_doc", "document")
+    cached_document = cache.get(requirements_data, partition=project_name)
+    if cached_document is not None:
+        return cached_document
+
     try:
         console.print(f"[cyan]Generating requirements document for {project_name}...[/cyan]")
         
-        # Create a specialized agent for document generation
-        doc_agent = Agent(
-            system_prompt=f"""You are a requirements document generator for project: {project_name}
-Create a professional Markdown-formatted requirements document based on the collected information.
-Include all sections with clear headings, bullet points for clarity, and proper formatting.
-Be comprehensive but concise. Include an executive summary at the beginning.
-Focus only on creating a requirements document. Do not include any code or implementation details."""
+        # Call the shared document agent; the project is named in the message
+        document = ask_specialist(
+            "document",
+            f"Project: {project_name}\nGenerate a requirements document in Markdown format based on this information:\n\n{requirements_data}"
         )
         
-        # Call the agent to generate the document
-        document = doc_agent(f"Generate a requirements document in Markdown format based on this information:\n\n{requirements_data}")
-        
         console.print(f"[green]Document generation complete.[/green]")
+        cache.put(requirements_data, str(document), partition=project_name)
         return str(document)
     except Exception as e:
         console.print(f"[yellow]Error in document generation: {str(e)}.[/yellow]")
         return f"Error occurred during document generation: {str(e)}"
 
+@functools.lru_cache(maxsize=None)
+def specialist_tools():
+    """Return the specialist functions wrapped as Strands tools, wrapping them once."""
+    from strands import tool
+    return (tool(evaluate_confidence), tool(validate_response), tool(generate_requirements_doc))
+
+# boto3, strands and the heavier rich modules are imported on first use so that
+# paths like --help don't pay for them at startup.
+
+@functools.lru_cache(maxsize=None)
+def get_bedrock_client_config():
+    """Return the botocore Config shared by all AWS clients."""
+    from botocore.config import Config
+    return Config(**BEDROCK_CLIENT_SETTINGS)
+
+# Clients are built from one explicit session rather than boto3's default one. Sessions
+# aren't thread-safe and clients are also built on worker threads, such as the storage
+# prewarm, so building takes a lock.
+_aws_session_lock = threading.Lock()
+
+@functools.lru_cache(maxsize=None)
+def get_aws_session():
+    """Return the boto3 session all AWS clients are built from."""
+    import boto3
+    return boto3.session.Session()
+
+@functools.lru_cache(maxsize=None)
+def _get_aws_client(service_name, region, resource=False):
+    """Return the client (or resource) for an AWS service and region, building it only once."""
+    with _aws_session_lock:
+        session = get_aws_session()
+        build = session.resource if resource else session.client
+        return build(service_name, region_name=region, config=get_bedrock_client_config())
+
+# The factories resolve the default region before the client cache, so a call with no
+# region and one naming AWS_REGION share a client
+
+def get_bedrock_agent_client(region=None):
+    """Return the Bedrock agent runtime client (knowledge base Retrieve) for a region."""
+    return _get_aws_client('bedrock-agent-runtime', region or AWS_REGION)
+
+def get_bedrock_runtime_client(region=None):
+    """Return the Bedrock runtime client for a region."""
+    return _get_aws_client('bedrock-runtime', region or AWS_REGION)
+
+def get_dynamodb_resource(region=None):
+    """Return the DynamoDB resource for a region."""
+    return _get_aws_client('dynamodb', region or AWS_REGION, resource=True)
+
+def get_s3_client(region=None):
+    """Return the S3 client for a region."""
+    return _get_aws_client('s3', region or AWS_REGION)
+
+@functools.lru_cache(maxsize=None)
+def get_bedrock_model():
+    """
+    Return the shared Bedrock model for all agents, or None to use the Strands default.
+
+    Set BEDROCK_LATENCY_OPTIMIZED=1 to request latency-optimized inference.
+    """
+    if not (BEDROCK_MODEL_ID or BEDROCK_LATENCY_OPTIMIZED):
+        return None
+    model_config = {}
+    if BEDROCK_MODEL_ID:
+        model_config["model_id"] = BEDROCK_MODEL_ID
+    if BEDROCK_LATENCY_OPTIMIZED:
+        model_config["additional_args"] = {"performanceConfig": {"latency": "optimized"}}
+    from strands.models import BedrockModel
+    return BedrockModel(region_name=AWS_REGION, boto_client_config=get_bedrock_client_config(), **model_config)
+
+_embeddings_available = True
+
+def embed_text(text):
+    """
+    Embed text with the Titan embeddings model for semantic cache lookups.
+
+    Returns a unit-length vector, or None if embeddings are disabled or unavailable.
+    """
+    global _embeddings_available
+    if not (SEMANTIC_CACHE_ENABLED and _embeddings_available):
+        return None
+    try:
+        response = get_bedrock_runtime_client().invoke_model(
+            modelId=EMBEDDING_MODEL_ID,
+            body=_json_dumps({"inputText": text})
+        )
+        embedding = _json_loads(response["body"].read())["embedding"]
+    except Exception as e:
+        # Don't pay for a failing call on every lookup; fall back to exact matches only
+        logger.warning("Embeddings unavailable, using exact cache matches only: %s", e)
+        _embeddings_available = False
+        return None
+    norm = math.sqrt(sum(x * x for x in embedding)) or 1.0
+    return [x / norm for x in embedding]
+
+class SemanticCache:
+    """
+    Two-tier response cache persisted to disk.
+
+    Lookups first try an exact match on the normalized text, then, if semantic matching
+    is on, fall back to the most similar stored entry in the same partition, if it clears
+    the threshold. Partitions keep entries for different sections or projects apart, and
+    a version (such as a prompt and model hash) keeps entries from older setups from matching.
+    """
+
+    def __init__(self, name, threshold=SEMANTIC_CACHE_THRESHOLD, ttl=None, semantic=SEMANTIC_CACHE_ENABLED,
+                 max_entries=CACHE_MAX_ENTRIES, version=None):
+        self.path = os.path.join(CACHE_DIR, name)
+        self.version = version
+        self.threshold = threshold
+        self.ttl = ttl
+        self.semantic = semantic
+        self.max_entries = max_entries
+        self._entries = None
+        self._pending_embeddings = {}
+        # Worker threads share a cache; shelve doesn't allow concurrent access
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize(text):
+        """Lowercase and collapse whitespace so trivially different texts share a key."""
+        return " ".join(str(text).lower().split())
+
+    @classmethod
+    def make_key(cls, text, partition=None):
+        """Return the storage key for text within a partition."""
+        key = cls.normalize(text)
+        return key if partition is None else f"{partition}\x1f{key}"
+
+    def _versioned(self, partition):
+        """Return the partition qualified by this cache's version, if it has one."""
+        if self.version is None:
+            return partition
+        return f"{self.version}\x1e{partition or ''}"
+
+    def _load(self):
+        # Callers hold self._lock
+        if self._entries is None:
+            self._entries = {}
+            try:
+                os.makedirs(CACHE_DIR, exist_ok=True)
+                with shelve.open(self.path) as db:
+                    self._entries = dict(db)
+            except Exception as e:
+                logger.warning("Could not load cache %s: %s", self.path, e)
+        return self._entries
+
+    def _is_fresh(self, entry):
+        return self.ttl is None or time.time() - entry["stored_at"] < self.ttl
+
+    def get(self, text, partition=None):
+        """Return the cached value for text in a partition, or None on a miss."""
+        partition = self._versioned(partition)
+        key = self.make_key(text, partition)
+        with self._lock:
+            entries = self._load()
+            entry = entries.get(key)
+            if entry is not None and self._is_fresh(entry):
+                return entry["value"]
+            if not self.semantic:
+                return None
+            candidates = [
+                candidate for candidate in entries.values()
+                if candidate.get("partition") == partition and candidate["embedding"] is not None
+                and self._is_fresh(candidate)
+            ]
+        if not candidates:
+            return None
+
+        embedding = embed_text(self.normalize(text))
+        if embedding is None:
+            return None
+        # Keep the embedding so a following put() doesn't compute it again
+        self._pending_embeddings[key] = embedding
+
+        best_score, best_value = 0.0, None
+        for candidate in candidates:
+            score = sum(a * b for a, b in zip(embedding, candidate["embedding"]))
+            if score > best_score:
+                best_score, best_value = score, candidate["value"]
+        return best_value if best_score >= self.threshold else None
+
+    def put(self, text, value, partition=None):
+        """Store value for text in a partition, in memory and on disk."""
+        partition = self._versioned(partition)
+        key = self.make_key(text, partition)
+        embedding = None
+        if self.semantic:
+            embedding = self._pending_embeddings.pop(key, None) or embed_text(self.normalize(text))
+        entry = {"stored_at": time.time(), "partition": partition, "embedding": embedding, "value": value}
+        with self._lock:
+            entries = self._load()
+            entries[key] = entry
+            # Past the size bound, drop the oldest entries
+            evicted = []
+            if self.max_entries is not None and len(entries) > self.max_entries:
+                evicted = sorted(entries, key=lambda k: entries[k]["stored_at"])[:len(entries) - self.max_entries]
+                for old_key in evicted:
+                    del entries[old_key]
+            try:
+                with shelve.open(self.path) as db:
+                    db[key] = entry
+                    for old_key in evicted:
+                        db.pop(old_key, None)
+            except Exception as e:
+                logger.warning("Could not persist cache %s: %s", self.path, e)
+
+@functools.lru_cache(maxsize=None)
+def get_kb_cache(kb_id):
+    """Return the result cache for one knowledge base."""
+    return SemanticCache(f"kb_{kb_id}", ttl=KB_CACHE_TTL)
+
+@functools.lru_cache(maxsize=None)
+def get_tool_cache(tool_name, role):
+    """
+    Return the result cache for one specialist tool, backed by the given specialist role.
+
+    Lookups are exact unless SEMANTIC_TOOL_CACHE=1 as well; a near-identical response can still
+    deserve a different judgement, so similarity matching is opt-in, with a stricter
+    threshold. Entries are partitioned by section or project by the callers, and versioned
+    by the specialist's prompt and model so editing either stops old results being served.
+    """
+    version = hashlib.blake2b(
+        f"{BEDROCK_MODEL_ID}\x1f{SPECIALIST_PROMPTS[role]}".encode("utf-8"), digest_size=8
+    ).hexdigest()
+    return SemanticCache(
+        f"tool_{tool_name}",
+        threshold=TOOL_CACHE_THRESHOLD,
+        ttl=TOOL_CACHE_TTL,
+        semantic=SEMANTIC_CACHE_ENABLED and SEMANTIC_TOOL_CACHE,
+        version=version
+    )
+
+def retrieve_kb_results(query, number_of_results=3):
+    """Run one retrieval against the knowledge base and return the raw results."""
+    response = get_bedrock_agent_client().retrieve(
+        knowledgeBaseId=KNOWLEDGE_BASE_ID,
+        retrievalQuery={'text': query},
+        retrievalConfiguration={
+            'vectorSearchConfiguration': {
+                'numberOfResults': number_of_results,
+                'overrideSearchType': 'HYBRID'
+            }
+        }
+    )
+    return response.get('retrievalResults', [])
+
+def format_kb_result(i, result):
+    """Format one retrieval result with its source for use in a prompt."""
+    content = result.get('content', {}).get('text', 'No content')
+    metadata = result.get('documentMetadata') or {}
+    source = metadata.get('source') or metadata.get('location') or "Unknown source"
+    return f"Source {i} ({source}):\n{content}\n"
+
+# Words of four or more letters; shorter words are too common to indicate a topic
+_KEYWORD_RE = re.compile(r"[a-z]{4,}", re.IGNORECASE)
+
+def _keywords(text):
+    """Return the distinctive lowercase words of text, for rough topic matching."""
+    return {word.lower() for word in _KEYWORD_RE.findall(text)}
+
+# Topic vocabulary for each section, tokenized once rather than on every prefetch
+_SECTION_KEYWORDS = tuple(_keywords(f"{section.title} {section.question}") for section in SECTIONS)
+
+# Vocabulary expected in a good response to each section, for local scoring
+SECTION_VOCABULARY = {
+    "PROJECT SCOPE": frozenset({
+        "goal", "goals", "objective", "objectives", "scope", "deliverable", "deliverables",
+        "stakeholder", "stakeholders", "purpose", "milestone", "milestones", "timeline",
+        "budget", "include", "exclude", "phase", "features", "problem",
+    }),
+    "USER STORIES": frozenset({
+        "user", "users", "story", "stories", "workflow", "workflows", "persona", "personas",
+        "role", "roles", "want", "able", "case", "cases", "customer", "customers", "admin",
+        "journey", "task", "tasks",
+    }),
+    "TECHNICAL CONSTRAINTS": frozenset({
+        "platform", "platforms", "browser", "mobile", "database", "integration", "performance",
+        "security", "latency", "scalability", "cloud", "server", "language", "framework",
+        "limitation", "limitations", "compliance", "offline", "hardware", "version",
+    }),
+    "SUCCESS CRITERIA": frozenset({
+        "metric", "metrics", "measure", "measured", "target", "targets", "acceptance",
+        "criteria", "success", "percent", "rate", "within", "least", "seconds", "uptime",
+        "satisfaction", "adoption", "reduce", "increase", "test",
+    }),
+    "FILE FORMAT SUPPORT": frozenset({
+        "format", "formats", "file", "files", "json", "yaml", "html", "markdown", "image",
+        "images", "import", "export", "upload", "download", "encoding", "schema", "size",
+        "docx", "xlsx", "text",
+    }),
+}
+
+def _cheap_score(response, section_name):
+    """
+    Score a response locally from its length and overlap with the section's vocabulary.
+
+    Returns:
+        Tuple of (score out of 10, number of section keywords used)
+    """
+    word_count = len(response.split())
+    matched = len(_keywords(response) & SECTION_VOCABULARY.get(section_name.upper(), frozenset()))
+    if word_count >= CHEAP_SCORE_MIN_WORDS and matched >= CHEAP_SCORE_MIN_KEYWORDS:
+        return CHEAP_SCORE, matched
+    # Below the bar: a rough score, capped under the score for a detailed response
+    return min(CHEAP_SCORE - 1.0, SHORT_RESPONSE_SCORE + word_count / 25 + matched / 2), matched
+
+def prefetch_section_knowledge(project_name):
+    """
+    Fetch knowledge base context for every section with a single retrieval.
+
+    One combined query covers all sections; each result is then assigned to the
+    section whose name and question share the most words with it. Results that
+    share no words with any section are dropped.
+
+    Args:
+        project_name: The name of the project being gathered
+
+    Returns:
+        Dictionary mapping section name to formatted knowledge base text
+    """
+    combined_query = " ".join(
+        f"Best practices for {section.topic} in requirements gathering for {project_name}."
+        for section in SECTIONS
+    )
+    console.print(f"\n[bold cyan]Querying knowledge base for all {len(SECTIONS)} sections...[/bold cyan]")
+
+    section_cache = get_kb_cache(f"{KNOWLEDGE_BASE_ID}_sections")
+    cached_context = section_cache.get(combined_query)
+    if cached_context is not None:
+        console.print("[green]Using cached knowledge base results.[/green]")
+        return cached_context
+
+    try:
+        results = retrieve_kb_results(combined_query, number_of_results=15)
+    except Exception as e:
+        error_msg = f"Error querying knowledge base: {str(e)}"
+        logger.error(error_msg)
+        console.print(f"[red]{error_msg}[/red]")
+        return {title: error_msg for title in SECTION_TITLES}
+
+    # Results arrive best first. Off-topic results (no shared words) are dropped, and a
+    # result tied between sections goes to whichever of them has the fewest results so far.
+    grouped = {title: [] for title in SECTION_TITLES}
+    for result in results:
+        result_keywords = _keywords(result.get('content', {}).get('text', ''))
+        overlaps = [len(result_keywords & keywords) for keywords in _SECTION_KEYWORDS]
+        best_overlap = max(overlaps)
+        if best_overlap == 0:
+            continue
+        tied = [title for title, overlap in zip(SECTION_TITLES, overlaps) if overlap == best_overlap]
+        grouped[min(tied, key=lambda title: len(grouped[title]))].append(result)
+
+    section_context = {}
+    for section, section_results in grouped.items():
+        if section_results:
+            section_context[section] = "\n".join(
+                [format_kb_result(i, result) for i, result in enumerate(section_results, 1)]
+            )
+        else:
+            section_context[section] = "No information found in the knowledge base for this section."
+
+    console.print(f"[green]Found {len(results)} relevant results in knowledge base.[/green]")
+    section_cache.put(combined_query, section_context)
+    return section_context
+
 def query_knowledge_base(query):
     """Tool to query the Amazon Bedrock Knowledge Base."""
+    from botocore.exceptions import ClientError
+
+    # Too short to match anything useful; don't spend a retrieval finding that out
+    if len((query or "").strip()) < MIN_KB_QUERY_CHARS:
+        return NO_KB_RESULTS
+
     try:
         console.print(f"\n[bold cyan]Querying knowledge base for:[/bold cyan] {query}")
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            BarColumn(),
-            TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
-            console=console
-        ) as progress:
-            search_task = progress.add_task("[cyan]Searching knowledge base...", total=100)
-
-            # Initialize the Bedrock client
-            bedrock_agent_client = boto3.client('bedrock-agent', region_name=AWS_REGION)
-
-            # Update progress
-            progress.update(search_task, advance=30)
-
-            # Call the Bedrock Knowledge Base API
-            response = bedrock_agent_client.retrieve(
-                knowledgeBaseId=KNOWLEDGE_BASE_ID,
-                retrievalQuery={'text': query},
-                retrievalConfiguration={
-                    'vectorSearchConfiguration': {
-                        'numberOfResults': 3,
-                        'overrideSearchType': 'HYBRID'
-                    }
-                }
-            )
 
-            # Update progress
-            progress.update(search_task, advance=40)
-
-            # Process results
-            results = response.get('retrievalResults', [])
-            if not results:
-                progress.update(search_task, completed=100)
-                console.print("[yellow]No information found in the knowledge base.[/yellow]")
-                return "No information found in the knowledge base for this query."
-
-            # Format results
-            formatted_results = []
-            for i, result in enumerate(results, 1):
-                content = result.get('content', {}).get('text', 'No content')
-                source = "Unknown source"
-                
-                # Try to extract source from metadata
-                if 'documentMetadata' in result:
-                    metadata = result['documentMetadata']
-                    if 'source' in metadata:
-                        source = metadata['source']
-                    elif 'location' in metadata:
-                        source = metadata['location']
-                
-                formatted_results.append(f"Source {i} ({source}):\n{content}\n")
-                progress.update(search_task, advance=10)
-
-            progress.update(search_task, completed=100)
-            result_text = "\n".join(formatted_results)
-            console.print(f"[green]Found {len(results)} relevant results in knowledge base.[/green]")
+        # Serve repeated or near-identical queries without another retrieval
+        kb_cache = get_kb_cache(KNOWLEDGE_BASE_ID)
+        cached_result = kb_cache.get(query)
+        if cached_result is not None:
+            console.print("[green]Using cached knowledge base results.[/green]")
+            return cached_result
+
+        # A single blocking call with no measurable progress; a spinner is all it needs
+        with console.status("[cyan]Searching knowledge base...[/cyan]", spinner="dots"):
+            results = retrieve_kb_results(query)
+
+        # Process results
+        if not results:
+            console.print("[yellow]No information found in the knowledge base.[/yellow]")
+            result_text = NO_KB_RESULTS
+            kb_cache.put(query, result_text)
             return result_text
 
+        # Format results
+        result_text = "\n".join([format_kb_result(i, result) for i, result in enumerate(results, 1)])
+        console.print(f"[green]Found {len(results)} relevant results in knowledge base.[/green]")
+        kb_cache.put(query, result_text)
+        return result_text
+
     except ClientError as e:
         error_msg = f"Error querying knowledge base: {str(e)}"
         logger.error(error_msg)
@@ -258,26 +828,72 @@ def query_knowledge_base(query):
         console.print(f"[red]{error_msg}[/red]")
         return error_msg
 
-def display_section_progress():
-    """Display progress through the requirements gathering sections."""
-    global current_section
-    console.print("\n[bold cyan]Requirements Gathering Progress:[/bold cyan]")
+@functools.lru_cache(maxsize=None)
+def get_prompt_session():
+    """
+    Return a prompt_toolkit session shared by every prompt in this process.
+
+    The session keeps its history on disk, suggests earlier entries, and completes
+    section names. Returns None when stdin isn't a terminal.
+    """
+    if not sys.stdin.isatty():
+        return None
+    from prompt_toolkit import PromptSession
+    from prompt_toolkit.auto_suggest import AutoSuggestFromHistory
+    from prompt_toolkit.completion import WordCompleter
+    from prompt_toolkit.history import FileHistory
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    return PromptSession(
+        history=FileHistory(os.path.join(CACHE_DIR, "prompt_history")),
+        auto_suggest=AutoSuggestFromHistory(),
+        completer=WordCompleter(list(SECTION_TITLES), ignore_case=True)
+    )
+
+def prompt_user(message):
+    """Read one line from the user, falling back to input() without a terminal."""
+    session = get_prompt_session()
+    if session is None:
+        return input(message)
+    return session.prompt(message)
+
+def _build_section_progress_table():
+    """
+    Build a section progress table for a session.
+
+    Returns:
+        Tuple of (table, status cell per section); the cells are updated in place
+    """
+    from rich.table import Table
     table = Table(show_header=False, box=None, padding=(0, 1))
     table.add_column("Status", style="bold")
     table.add_column("Section")
+    statuses = tuple(Text() for _ in SECTIONS)
+    for section, status in zip(SECTIONS, statuses):
+        table.add_row(status, f"Section {section.idx + 1}: {section.title}")
+    return table, statuses
 
-    for i, section in enumerate(SECTIONS):
-        if i < current_section:
-            status = "[green]✓[/green]"
-        elif i == current_section:
-            status = "[yellow]►[/yellow]"
+def display_section_progress(session):
+    """Display a session's progress through the requirements gathering sections."""
+    console.print("\n[bold cyan]Requirements Gathering Progress:[/bold cyan]")
+    if session.progress_table is None:
+        session.progress_table = _build_section_progress_table()
+    table, statuses = session.progress_table
+
+    current_section = session.current_section
+    for section, status in zip(SECTIONS, statuses):
+        if section.idx < current_section:
+            status.plain, status.style = "✓", "green"
+        elif section.idx == current_section:
+            status.plain, status.style = "►", "yellow"
         else:
-            status = "[dim]○[/dim]"
-        table.add_row(status, f"Section {i+1}: {section}")
+            status.plain, status.style = "○", "dim"
 
     console.print(table)
     console.print(f"\n[cyan]Progress: {current_section}/{len(SECTIONS)} sections completed[/cyan]\n")
 
+_SCORE_LABEL_RE = re.compile(r"(?:confidence|score):\s*(\d+(?:\.\d+)?)", re.IGNORECASE)
+_SCORE_OUT_OF_TEN_RE = re.compile(r"(\d+(?:\.\d+)?)/10", re.IGNORECASE)
+
 def extract_confidence_score(evaluation_text):
     """Extract confidence score from evaluation text."""
     # Handle dictionary result
@@ -290,13 +906,11 @@ def extract_confidence_score(evaluation_text):
             return 7.0
     
     # Extract the confidence score using regex
-    score_pattern = r"(?:confidence|score):\s*(\d+(?:\.\d+)?)"
-    score_match = re.search(score_pattern, evaluation_text.lower())
+    score_match = _SCORE_LABEL_RE.search(evaluation_text)
     
     # If no match, try to find any number out of 10
     if not score_match:
-        score_pattern = r"(\d+(?:\.\d+)?)/10"
-        score_match = re.search(score_pattern, evaluation_text.lower())
+        score_match = _SCORE_OUT_OF_TEN_RE.search(evaluation_text)
     
     # Default if no score found
     confidence_score = float(score_match.group(1)) if score_match else 7.0
@@ -304,6 +918,101 @@ def extract_confidence_score(evaluation_text):
     # Ensure score is within bounds
     return max(0.0, min(10.0, confidence_score))
 
+def _extract_user_text(handoff_result):
+    """Return the user's reply from a handoff_to_user result, without the tool's prefix."""
+    return handoff_result["content"][0]["text"].removeprefix("User response received: ")
+
+def assess_section(agent, section, response, executor=None):
+    """
+    Evaluate one section's response and validate it if confidence is low.
+
+    Safe to run for several sections at once: the tool calls are not recorded in the
+    main agent's history, and each request borrows a specialist agent of its own.
+    Given an executor, the validation starts alongside the evaluation so a weak
+    section doesn't wait for both in turn; it runs quietly, and its result is dropped
+    if the score is high.
+
+    Returns:
+        Tuple of (confidence score, validation result or None)
+    """
+    validate = functools.partial(
+        agent.tool.validate_response,
+        response=response,
+        section_name=section,
+        record_direct_tool_call=False
+    )
+    validation_future = executor.submit(run_quietly, validate) if executor is not None else None
+
+    evaluation_result = agent.tool.evaluate_confidence(
+        response=response,
+        section_name=section,
+        record_direct_tool_call=False
+    )
+    confidence_score = extract_confidence_score(evaluation_result)
+
+    if confidence_score >= 7.0:
+        # Don't leave a dropped validation running into the next phase
+        if validation_future is not None and not validation_future.cancel():
+            wait_for_futures([validation_future])
+        return confidence_score, None
+
+    # Validate responses with low confidence
+    console.print(f"[yellow]Low confidence for {section}. Validating response...[/yellow]")
+    validation_result = validation_future.result() if validation_future is not None else validate()
+    return confidence_score, validation_result
+
+def assess_sections(agent, responses):
+    """
+    Assess every section's response concurrently, reporting the results in section order.
+
+    Returns:
+        Tuple of (section to confidence score, section to validation result for weak sections)
+    """
+    confidence_scores = {}
+    validation_issues = {}
+    
+    # Sections are independent, so evaluate them concurrently. Speculative validations
+    # get their own pool so an assessment never waits on a queued task behind itself.
+    validation_executor = get_executor("validate") if SPECULATIVE_VALIDATION else None
+    assessments = list(get_executor("assess").map(
+        lambda item: assess_section(agent, *item, executor=validation_executor), responses.items()
+    ))
+    
+    for section, (confidence_score, validation_result) in zip(responses, assessments):
+        confidence_scores[section] = confidence_score
+        console.print(f"[green]Confidence score for {section}: {confidence_score:.1f}/10[/green]")
+        
+        if validation_result is not None:
+            validation_issues[section] = validation_result
+            console.print(f"[yellow]Issues found in {section}:[/yellow]")
+            console.print(f"[yellow]{validation_result}[/yellow]")
+    
+    return confidence_scores, validation_issues
+
+WELCOME_MARKUP = (
+    "[bold blue]REQUIREMENTS GATHERING SYSTEM[/bold blue]\n"
+    "[cyan]Interactive AI-Powered Requirements Collection[/cyan]\n\n"
+    "[white]This system will guide you through:[/white]\n"
+    "[green]* Project Scope Definition\n"
+    "* User Stories & Workflows\n"
+    "* Technical Constraints\n"
+    "* Success Criteria & Metrics\n"
+    "* File Formats & Data Specs[/green]\n"
+    "\n[dim]Features: AI Analysis, Smart Follow-ups, Rich Output, Document Generation{kb_feature}[/dim]"
+)
+
+@functools.lru_cache(maxsize=2)
+def _welcome_panel(use_kb):
+    """Build the welcome banner shown at the start of a gathering run."""
+    kb_feature = ", Knowledge Base Integration" if use_kb else ""
+    return Panel(
+        Text.from_markup(WELCOME_MARKUP.format(kb_feature=kb_feature)),
+        title="Welcome",
+        title_align="center",
+        border_style="blue",
+        padding=(1, 2)
+    )
+
 def gather_requirements(project_name=None, use_kb=False):
     """
     Main function to run the requirements gathering system.
@@ -315,123 +1024,81 @@ def gather_requirements(project_name=None, use_kb=False):
     Returns:
         Dictionary with complete requirements gathering results
     """
-    global current_section, responses
-
-    # Reset global state for new run
-    current_section = 0
-    responses = {}
+    # Progress and collected responses belong to this run only
+    session = RequirementsSession(project_name=project_name or "")
+    responses = session.responses
 
     try:
         # Display welcome banner
-        welcome_text = Text()
-        welcome_text.append("REQUIREMENTS GATHERING SYSTEM\n", style="bold blue")
-        welcome_text.append("Interactive AI-Powered Requirements Collection\n\n", style="cyan")
-        welcome_text.append("This system will guide you through:\n", style="white")
-        welcome_text.append("* Project Scope Definition\n", style="green")
-        welcome_text.append("* User Stories & Workflows\n", style="green")
-        welcome_text.append("* Technical Constraints\n", style="green")
-        welcome_text.append("* Success Criteria & Metrics\n", style="green")
-        welcome_text.append("* File Formats & Data Specs\n", style="green")
-
-        features_text = "Features: AI Analysis, Smart Follow-ups, Rich Output, Document Generation"
-        if use_kb:
-            features_text += ", Knowledge Base Integration"
-        welcome_text.append(f"\n{features_text}", style="dim")
-
-        console.print(Panel(
-            welcome_text,
-            title="Welcome",
-            title_align="center",
-            border_style="blue",
-            padding=(1, 2)
-        ))
+        console.print(_welcome_panel(use_kb))
 
         # Get project name if not provided
         if not project_name:
             console.print("\n[bold cyan]Let's start by naming your project:[/bold cyan]")
-            project_name = input("Project name: ").strip()
+            project_name = prompt_user("Project name: ").strip()
             if not project_name:
                 project_name = "Unnamed Project"
                 console.print(f"[yellow]Using default name: {project_name}[/yellow]")
+            session.project_name = project_name
 
         console.print(f"\n[green]Starting requirements gathering for: {project_name}[/green]\n")
 
         # Set up tools list
-        tools = [handoff_to_user, evaluate_confidence, validate_response, generate_requirements_doc]
+        from strands import Agent
+        from strands_tools import handoff_to_user
+        tools = [handoff_to_user, *specialist_tools()]
 
         # Add knowledge base tool if enabled
         if use_kb:
             tools.append(query_knowledge_base)
             console.print(f"[cyan]Knowledge Base integration enabled (ID: {KNOWLEDGE_BASE_ID})[/cyan]")
 
-        # Create a simple, direct system prompt
-        kb_prompt_addition = """
-Before asking questions, use the query_knowledge_base tool to search for relevant information.
-""" if use_kb else ""
-
-        system_prompt = f"""You are a requirements gathering assistant for project: {project_name}
-
-Your task is to collect requirements through these 5 specific sections:
-1. PROJECT SCOPE: Project objectives, goals, scope
-2. USER STORIES: User stories, use cases, workflows
-3. TECHNICAL CONSTRAINTS: Technical requirements, platforms, limitations
-4. SUCCESS CRITERIA: Success metrics and acceptance criteria
-5. FILE FORMAT SUPPORT: Required file formats and data specifications
+        # Fetch knowledge base context for all sections up front, in one retrieval
+        section_context = prefetch_section_knowledge(project_name) if use_kb else {}
 
-Follow this exact process:
-1. Ask ONE specific question for each section, one at a time
-2. Use handoff_to_user to collect the user's response for each question
-3. After collecting all 5 responses, ask if the user wants to add anything else to any section
-4. If yes, collect additional input using handoff_to_user
-5. After collecting all information, use evaluate_confidence tool to assess each section
-6. For sections with low confidence, use validate_response tool to identify issues
-7. Use generate_requirements_doc tool to create a Markdown requirements document
-8. Ask the user to review the document before saving
+        # Create a simple, direct system prompt
+        kb_prompt_addition = ""
+        if use_kb:
+            kb_context_block = "\n".join(
+                f"### {section}\n{context}\n" for section, context in section_context.items()
+            )
+            kb_prompt_addition = f"""
+Use this knowledge base information when asking questions. Only use the query_knowledge_base tool
+if you need something more specific than what is provided here.
 
-{kb_prompt_addition}
+{kb_context_block}"""
 
-Be direct and concise in your questions. For each section, ask a focused question that will help gather comprehensive information.
-"""
+        system_prompt = SYSTEM_PROMPT_TEMPLATE.format(project_name=project_name, kb=kb_prompt_addition)
 
         # Create agent with tools
         console.print("[cyan]Initializing requirements gathering agent...[/cyan]")
         agent = Agent(
+            model=get_bedrock_model(),
             tools=tools,
             system_prompt=system_prompt
         )
 
         # Start the requirements gathering process
         console.print("\n[bold cyan]Starting the requirements gathering process...[/bold cyan]")
-        display_section_progress()
-
-        # Define specific questions for each section
-        section_questions = [
-            "What are the main objectives, goals, and scope of this project?",
-            "What are the key user stories, use cases, and workflows for this project?",
-            "What technical constraints, platform requirements, and limitations should be considered?",
-            "What are the success criteria and acceptance metrics for this project?",
-            "What file formats and data specifications need to be supported by this project?"
-        ]
+        display_section_progress(session)
 
         # Collect responses for each section
-        for i, section in enumerate(SECTIONS):
-            current_section = i
-            display_section_progress()
+        for section in SECTIONS:
+            session.current_section = section.idx
+            display_section_progress(session)
             
-            # Query knowledge base if enabled
-            kb_info = ""
+            # Show the prefetched knowledge base information if enabled
             if use_kb:
-                kb_info = query_knowledge_base(f"best practices for {section.lower()} in software projects")
-                console.print(f"\n[dim]Knowledge base information for {section}:[/dim]\n{kb_info}\n")
+                console.print(f"\n[dim]Knowledge base information for {section.title}:[/dim]\n{section_context[section.title]}\n")
             
             # Ask the question for this section
-            console.print(f"\n[bold cyan]Section {i+1}: {section}[/bold cyan]")
+            console.print(f"\n[bold cyan]Section {section.idx + 1}: {section.title}[/bold cyan]")
             
-            # Prepare prompt for the agent
+            # Prepare prompt for the agent; knowledge base context is already in the system prompt
             if use_kb:
-                prompt = f"Based on this knowledge base information: {kb_info}\n\nAsk the user about {section}: {section_questions[i]}"
+                prompt = f"Using the knowledge base information for {section.title}, ask the user about {section.title}: {section.question}"
             else:
-                prompt = f"Ask the user about {section}: {section_questions[i]}"
+                prompt = f"Ask the user about {section.title}: {section.question}"
             
             # Get agent's formulation of the question
             question = agent(prompt)
@@ -440,21 +1107,18 @@ Be direct and concise in your questions. For each section, ask a focused questio
             # Use handoff_to_user to get the response
             # This is the correct way to use the tool through the agent
             response = agent.tool.handoff_to_user(
-                message=f"Please provide your input for {section}:",
+                message=f"Please provide your input for {section.title}:",
                 breakout_of_loop=False
             )
             
             # Extract the user response from the tool result
-            user_text = response["content"][0]["text"]
-            # Remove the "User response received: " prefix if present
-            if "User response received: " in user_text:
-                user_text = user_text.replace("User response received: ", "")
+            user_text = _extract_user_text(response)
             
             # Store the response
-            responses[section] = user_text
+            responses[section.title] = user_text
             
             # Provide brief acknowledgment
-            console.print(f"[green]Response for {section} recorded.[/green]")
+            console.print(f"[green]Response for {section.title} recorded.[/green]")
         
         # Ask if the user wants to add anything else
         console.print("\n[bold cyan]Additional Information[/bold cyan]")
@@ -468,15 +1132,13 @@ Be direct and concise in your questions. For each section, ask a focused questio
         )
         
         # Process additional information if provided
-        additional_text = additional_response["content"][0]["text"]
-        if "User response received: " in additional_text:
-            additional_text = additional_text.replace("User response received: ", "")
+        additional_text = _extract_user_text(additional_response)
             
-        if additional_text.lower() not in ["no", "n", "none", ""]:
+        if additional_text.strip().lower() not in NEGATIVE_ANSWERS:
             console.print("[green]Processing additional information...[/green]")
             
             # Create a prompt to categorize the additional information
-            categorize_prompt = f"""Categorize this additional information into the appropriate section(s) from these options: {', '.join(SECTIONS)}
+            categorize_prompt = f"""Categorize this additional information into the appropriate section(s) from these options: {', '.join(SECTION_TITLES)}
 
 Additional information: {additional_text}
 
@@ -488,9 +1150,7 @@ If information applies to multiple sections, return multiple sections separated
             categorized_info = agent(categorize_prompt)
             
             # Process the categorized information
-            import re
-            section_pattern = re.compile(r"(PROJECT SCOPE|USER STORIES|TECHNICAL CONSTRAINTS|SUCCESS CRITERIA|FILE FORMAT SUPPORT):\s*(.*?)(?=(?:PROJECT SCOPE|USER STORIES|TECHNICAL CONSTRAINTS|SUCCESS CRITERIA|FILE FORMAT SUPPORT):|$)", re.DOTALL)
-            matches = section_pattern.findall(str(categorized_info))
+            matches = split_categorized_info(str(categorized_info))
             
             for section, info in matches:
                 if section in responses:
@@ -500,49 +1160,20 @@ If information applies to multiple sections, return multiple sections separated
         # Now that we have all responses, evaluate confidence and validate
         console.print("\n[bold cyan]Evaluating Requirements Quality[/bold cyan]")
         
-        confidence_scores = {}
-        validation_issues = {}
-        
-        for section, response in responses.items():
-            # Use the evaluate_confidence tool
-            console.print(f"[cyan]Analyzing response quality for {section}...[/cyan]")
-            evaluation_result = agent.tool.evaluate_confidence(
-                response=response,
-                section_name=section
-            )
-            
-            # Extract confidence score
-            confidence_score = extract_confidence_score(evaluation_result)
-            confidence_scores[section] = confidence_score
-            
-            console.print(f"[green]Confidence score for {section}: {confidence_score:.1f}/10[/green]")
-            
-            # Validate responses with low confidence
-            if confidence_score < 7.0:
-                console.print(f"[yellow]Low confidence for {section}. Validating response...[/yellow]")
-                
-                validation_result = agent.tool.validate_response(
-                    response=response,
-                    section_name=section
-                )
-                
-                validation_issues[section] = validation_result
-                console.print(f"[yellow]Issues found in {section}:[/yellow]")
-                console.print(f"[yellow]{validation_result}[/yellow]")
+        confidence_scores, validation_issues = assess_sections(agent, responses)
         
         # Calculate overall confidence
         overall_confidence = sum(confidence_scores.values()) / len(confidence_scores) if confidence_scores else 0
         console.print(f"\n[bold]Overall Requirements Quality: {overall_confidence:.1f}/10[/bold]")
         
         # Prepare the requirements data for document generation
-        requirements_data = f"Project Name: {project_name}\n\n"
-        for section, response in responses.items():
-            requirements_data += f"{section}:\n{response}\n\n"
+        parts = [f"Project Name: {project_name}\n\n"]
+        parts.extend(f"{section}:\n{response}\n\n" for section, response in responses.items())
             
         # Add confidence scores to the input
-        requirements_data += "Confidence Scores:\n"
-        for section, score in confidence_scores.items():
-            requirements_data += f"{section}: {score:.1f}/10\n"
+        parts.append("Confidence Scores:\n")
+        parts.extend(f"{section}: {score:.1f}/10\n" for section, score in confidence_scores.items())
+        requirements_data = "".join(parts)
         
         # Generate the requirements document using the specialized tool
         console.print("\n[bold cyan]Generating Requirements Document[/bold cyan]")
@@ -555,19 +1186,24 @@ If information applies to multiple sections, return multiple sections separated
         console.print("\n[bold green]Requirements Document Draft:[/bold green]")
         console.print(Panel(requirements_doc, title="Requirements Document", border_style="green"))
         
+        # Set up the storage connections while the user reads the draft
+        threading.Thread(target=prewarm_storage, name="prewarm-storage", daemon=True).start()
+        
         # Ask for user review
         review_response = agent.tool.handoff_to_user(
             message="Please review the requirements document. Would you like to make any changes? If yes, please specify what changes you'd like to make:",
             breakout_of_loop=True
         )
         
+        # Generate timestamp for filename
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"requirements_{timestamp}.md"
+        
         # Process review feedback if provided
-        final_doc = requirements_doc
-        review_text = review_response["content"][0]["text"]
-        if "User response received: " in review_text:
-            review_text = review_text.replace("User response received: ", "")
+        final_doc_text = str(requirements_doc)
+        review_text = _extract_user_text(review_response)
             
-        if review_text.lower() not in ["no", "n", "none", "", "looks good", "approved"]:
+        if review_text.strip().lower() not in APPROVAL_ANSWERS:
             console.print("[green]Processing review feedback...[/green]")
             
             # Update the document based on feedback
@@ -580,19 +1216,14 @@ User feedback:
 
 Please update the document based on this feedback. Maintain the Markdown format and document structure.
 """
-            # Use the main agent to update the document
-            final_doc = agent(update_prompt)
+            # Use the main agent to update the document, saving it as it streams
+            final_doc_text = stream_document_to_file(agent, update_prompt, filename)
             
             console.print("\n[bold green]Updated Requirements Document:[/bold green]")
-            console.print(Panel(str(final_doc), title="Updated Requirements Document", border_style="green"))
-        
-        # Generate timestamp for filename
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"requirements_{timestamp}.md"
-        
-        # Save the requirements to a file
-        with open(filename, "w", encoding="utf-8") as f:
-            f.write(str(final_doc))
+            console.print(Panel(final_doc_text, title="Updated Requirements Document", border_style="green"))
+        else:
+            # Save the requirements to a file
+            Path(filename).write_text(final_doc_text, encoding="utf-8")
         
         console.print(f"\n[green]Requirements document saved as: {filename}[/green]")
         
@@ -604,51 +1235,17 @@ Please update the document based on this feedback. Maintain the Markdown format
                 breakout_of_loop=True
             )
             
-            save_to_db_text = save_to_db_response["content"][0]["text"]
-            if "User response received: " in save_to_db_text:
-                save_to_db_text = save_to_db_text.replace("User response received: ", "")
+            save_to_db_text = _extract_user_text(save_to_db_response)
                 
-            if save_to_db_text.lower() in ["yes", "y", "sure", "ok"]:
+            if save_to_db_text.strip().lower() in AFFIRMATIVE_ANSWERS:
                 console.print("[cyan]Saving to DynamoDB...[/cyan]")
                 
-                # Initialize DynamoDB client
-                dynamodb = boto3.resource('dynamodb', region_name=AWS_REGION)
-                table_name = "RequirementsDocuments"
-                
-                # Check if table exists, create if not
-                try:
-                    table = dynamodb.Table(table_name)
-                    table.table_status  # This will raise an exception if the table doesn't exist
-                except:
-                    console.print("[yellow]Table does not exist. Creating new table...[/yellow]")
-                    table = dynamodb.create_table(
-                        TableName=table_name,
-                        KeySchema=[
-                            {'AttributeName': 'project_id', 'KeyType': 'HASH'},
-                            {'AttributeName': 'timestamp', 'KeyType': 'RANGE'}
-                        ],
-                        AttributeDefinitions=[
-                            {'AttributeName': 'project_id', 'AttributeType': 'S'},
-                            {'AttributeName': 'timestamp', 'AttributeType': 'S'}
-                        ],
-                        ProvisionedThroughput={'ReadCapacityUnits': 5, 'WriteCapacityUnits': 5}
-                    )
-                    # Wait for table creation
-                    table.meta.client.get_waiter('table_exists').wait(TableName=table_name)
+                table = _ensure_requirements_table()
                 
-                # Save to DynamoDB
-                project_id = project_name.lower().replace(" ", "_")
-                item = {
-                    'project_id': project_id,
-                    'timestamp': timestamp,
-                    'project_name': project_name,
-                    'document': str(final_doc),
-                    'confidence_score': overall_confidence,
-                    'sections': {section: {'content': content, 'confidence': confidence_scores.get(section, 0)} 
-                                for section, content in responses.items()}
-                }
-                
-                table.put_item(Item=item)
+                save_requirements_record(
+                    table, project_name, timestamp, final_doc_text,
+                    responses, confidence_scores, overall_confidence
+                )
                 console.print("[green]Successfully saved to DynamoDB![/green]")
             else:
                 console.print("[yellow]Document not saved to DynamoDB.[/yellow]")
@@ -681,6 +1278,161 @@ Please update the document based on this feedback. Maintain the Markdown format
         console.print(f"\n[dim]Traceback:\n{traceback.format_exc()}[/dim]")
         return {"status": "error", "error": str(e), "traceback": traceback.format_exc()}
 
+def save_requirements_record(table, project_name, timestamp, document, responses,
+                             confidence_scores, overall_confidence):
+    """
+    Save a requirements document and its section responses to DynamoDB.
+
+    The metadata item holds the document inline, or its S3 URI when REQUIREMENTS_BUCKET
+    is set, keeping it under the 400 KB item limit; each section's response is stored
+    in its own row keyed "<timestamp>#<section>".
+
+    Args:
+        table: The requirements table
+        project_name: The name of the project
+        timestamp: The save timestamp, shared with the local file name
+        document: The final requirements document
+        responses: Section name to collected response
+        confidence_scores: Section name to confidence score
+        overall_confidence: The average confidence score
+    """
+    project_id = project_name.lower().replace(" ", "_")
+    section_confidence = {section: Decimal(str(confidence_scores.get(section, 0))) for section in responses}
+    item = {
+        'project_id': project_id,
+        'timestamp': timestamp,
+        'project_name': project_name,
+        'confidence_score': Decimal(str(overall_confidence)),
+        'document_length': len(document),
+        'sections': section_confidence
+    }
+    if REQUIREMENTS_BUCKET:
+        item['s3_uri'] = upload_requirements_document(project_id, timestamp, document)
+    else:
+        item['document'] = document
+    
+    # The metadata item must not overwrite an earlier save; section rows follow in batches
+    table.put_item(Item=item, ConditionExpression='attribute_not_exists(project_id)')
+    with table.batch_writer() as batch:
+        for section, content in responses.items():
+            batch.put_item(Item={
+                'project_id': project_id,
+                'timestamp': f"{timestamp}#{section}",
+                'section': section,
+                'content': content,
+                'confidence': section_confidence[section],
+                'content_length': len(content)
+            })
+
+def stream_document_to_file(agent, prompt, path):
+    """
+    Run a document-writing prompt on the agent, writing the text to path as it streams.
+
+    Args:
+        agent: The agent that writes the document
+        prompt: The request for the document
+        path: The file to write the document to
+
+    Returns:
+        The final document text
+    """
+    async def stream():
+        chunks = []
+        result = None
+        used_tool = False
+        with open(path, "w", encoding="utf-8", buffering=1) as f:
+            async for event in agent.stream_async(prompt):
+                if "data" in event:
+                    f.write(event["data"])
+                    chunks.append(event["data"])
+                elif "current_tool_use" in event:
+                    used_tool = True
+                elif "result" in event:
+                    result = event["result"]
+        return "".join(chunks), result, used_tool
+
+    streamed_text, result, used_tool = asyncio.run(stream())
+    # Text streamed before a tool call isn't part of the final answer; only then is the
+    # streamed file replaced with the answer itself
+    if used_tool and result is not None:
+        document = str(result)
+        if document.strip() != streamed_text.strip():
+            Path(path).write_text(document, encoding="utf-8")
+            return document
+    return streamed_text
+
+# The requirements table once it is known to exist, shared by the storage prewarm and the save
+_requirements_table = None
+_requirements_table_lock = threading.Lock()
+
+def _ensure_requirements_table(create=True):
+    """
+    Return the requirements table, checking it exists only once per process.
+
+    A missing table is created, or with create=False left alone and None returned.
+    """
+    from botocore.exceptions import ClientError
+    global _requirements_table
+    
+    with _requirements_table_lock:
+        if _requirements_table is not None:
+            return _requirements_table
+        
+        dynamodb = get_dynamodb_resource()
+        try:
+            dynamodb.meta.client.describe_table(TableName=REQUIREMENTS_TABLE)
+            _requirements_table = dynamodb.Table(REQUIREMENTS_TABLE)
+            return _requirements_table
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") != "ResourceNotFoundException":
+                raise
+        if not create:
+            return None
+        
+        console.print("[yellow]Table does not exist. Creating new table...[/yellow]")
+        table = dynamodb.create_table(
+            TableName=REQUIREMENTS_TABLE,
+            KeySchema=[
+                {'AttributeName': 'project_id', 'KeyType': 'HASH'},
+                {'AttributeName': 'timestamp', 'KeyType': 'RANGE'}
+            ],
+            AttributeDefinitions=[
+                {'AttributeName': 'project_id', 'AttributeType': 'S'},
+                {'AttributeName': 'timestamp', 'AttributeType': 'S'}
+            ],
+            ProvisionedThroughput={'ReadCapacityUnits': 5, 'WriteCapacityUnits': 5}
+        )
+        # Wait for table creation
+        table.meta.client.get_waiter('table_exists').wait(TableName=REQUIREMENTS_TABLE)
+        _requirements_table = table
+        return table
+
+def prewarm_storage():
+    """
+    Build the storage clients and open their connections ahead of a save.
+
+    Runs while the user reviews the document. It only reads, so nothing is created or
+    uploaded before the user chooses to save, and the table check is reused by the save.
+    """
+    try:
+        _ensure_requirements_table(create=False)
+        if REQUIREMENTS_BUCKET:
+            get_s3_client().head_bucket(Bucket=REQUIREMENTS_BUCKET)
+    except Exception as e:
+        # A missing table or absent credentials surface properly if the user saves
+        logger.debug("Storage prewarm skipped: %s", e)
+
+def upload_requirements_document(project_id, timestamp, document):
+    """Upload a requirements document to REQUIREMENTS_BUCKET and return its S3 URI."""
+    key = f"requirements/{project_id}/{timestamp}.md"
+    get_s3_client().put_object(
+        Bucket=REQUIREMENTS_BUCKET,
+        Key=key,
+        Body=document.encode("utf-8"),
+        ContentType="text/markdown"
+    )
+    return f"s3://{REQUIREMENTS_BUCKET}/{key}"
+
 def demo_with_sample_project(use_kb=False):
     """
     Demo function that runs requirements gathering for a sample project.
@@ -699,8 +1451,32 @@ def demo_with_sample_project(use_kb=False):
     ))
     return gather_requirements("Task Management App Demo", use_kb=use_kb)
 
-def print_usage():
-    """Print usage information for the demo script."""
+@functools.lru_cache(maxsize=8)
+def _render_static(renderable, width):
+    """Render a static renderable to the console's escape codes once per width."""
+    with console.capture() as capture:
+        console.print(renderable)
+    return capture.get()
+
+@functools.lru_cache(maxsize=8)
+def _plain_static(panel):
+    """Plain-text form of a panel: its title and content, without borders or styles."""
+    content = panel.renderable.plain if isinstance(panel.renderable, Text) else str(panel.renderable)
+    return f"{panel.title}\n\n{content.strip()}\n\n"
+
+def print_static(renderable):
+    """Print a renderable that never changes, reusing its rendered output on later calls."""
+    # Piped or redirected output gets plain text; borders and styles only help on a terminal
+    if not console.is_terminal and isinstance(renderable, Panel):
+        output = _plain_static(renderable)
+    else:
+        output = _render_static(renderable, console.width)
+    console.file.write(output)
+    console.file.flush()
+
+@functools.lru_cache(maxsize=None)
+def _usage_panel():
+    """Build the usage guide panel."""
     usage_text = (
         "\n# Requirements Gathering System Usage\n\n"
         "## Command Line Usage:\n"
@@ -716,6 +1492,19 @@ def print_usage():
         "```bash\n"
         "AWS_REGION # AWS region for knowledge base (default: ap-southeast-2)\n"
         "KNOWLEDGE_BASE_ID # ID of the knowledge base to use\n"
+        "BEDROCK_MODEL_ID # Model used by all agents (default: Strands default)\n"
+        "REQS_DELAY # Seconds to pause after the intro panels on a terminal (default: 0)\n"
+        "BEDROCK_LATENCY_OPTIMIZED # Set to 1 for latency-optimized inference, where supported\n"
+        "REQ_DEMO_LOG # Log level, e.g. INFO or DEBUG (default: WARNING)\n"
+        "REQ_DEMO_SKIP_LLM_EVAL # Set to 1 to score responses locally instead of with the evaluation agent\n"
+        "REQ_DEMO_SPECULATIVE_VALIDATION # Set to 1 to validate every section alongside its evaluation\n"
+        "REQUIREMENTS_TABLE # DynamoDB table for saved documents (default: RequirementsDocuments)\n"
+        "REQUIREMENTS_BUCKET # S3 bucket for saved documents; unset stores them in the table\n"
+        "REQUIREMENTS_CACHE_DIR # Directory for the result caches (default: ~/.cache/hitl)\n"
+        "REQUIREMENTS_CACHE_TTL # Seconds the evaluation tools' cached results stay valid (default: 604800)\n"
+        "SEMANTIC_CACHE # Set to 1 to also match cached results by embedding similarity\n"
+        "SEMANTIC_TOOL_CACHE # With SEMANTIC_CACHE=1, set to 1 to match tool results by similarity too\n"
+        "EMBEDDING_MODEL_ID # Embeddings model for the semantic cache (default: amazon.titan-embed-text-v2:0)\n"
         "```\n\n"
         "## Programmatic Usage:\n"
         "```python\n"
@@ -751,194 +1540,215 @@ def print_usage():
         "6. Save to file and optionally to DynamoDB\n\n"
     )
     
-    console.print(Panel(
+    return Panel(
         usage_text,
         title="Usage Guide",
         border_style="green"
-    ))
+    )
 
-def print_handoff_info():
-    """Print information about the handoff_to_user tool workflow."""
-    handoff_text = Text()
-    handoff_text.append("HANDOFF_TO_USER TOOL WORKFLOW\n\n", style="bold magenta")
-    handoff_text.append("This demo showcases two critical modes of the handoff_to_user tool:\n\n", style="white")
-    handoff_text.append("1. CONTINUE MODE (breakout_of_loop=False):\n", style="bold green")
-    handoff_text.append(" - Agent pauses execution and prompts the user\n", style="green")
-    handoff_text.append(" - Agent waits for user input\n", style="green")
-    handoff_text.append(" - After receiving input, agent CONTINUES processing\n", style="green")
-    handoff_text.append(" - Used for the first 5 requirements sections and review\n\n", style="green")
-    handoff_text.append("2. BREAK MODE (breakout_of_loop=True):\n", style="bold yellow")
-    handoff_text.append(" - Agent pauses execution and prompts the user\n", style="yellow")
-    handoff_text.append(" - Agent waits for user input\n", style="yellow")
-    handoff_text.append(" - After receiving input, agent STOPS execution completely\n", style="yellow")
-    handoff_text.append(" - Used for the additional information section to complete input gathering\n\n", style="yellow")
-    handoff_text.append("The workflow follows this pattern:\n", style="white")
-    handoff_text.append("Start -> Section 1 -> handoff(continue) -> Section 2 -> handoff(continue) -> \n", style="cyan")
-    handoff_text.append("Section 3 -> handoff(continue) -> Section 4 -> handoff(continue) -> \n", style="cyan")
-    handoff_text.append("Section 5 -> handoff(continue) -> Additional Info -> handoff(break) -> \n", style="cyan")
-    handoff_text.append("Validation -> Document Generation -> Review -> handoff(continue) -> Save\n\n", style="cyan")
-    handoff_text.append("This creates a structured, section-by-section requirements gathering process\n", style="white")
-    handoff_text.append("with human oversight at each critical decision point.", style="white")
-    console.print(Panel(
+def print_usage():
+    """Print usage information for the demo script."""
+    print_static(_usage_panel())
+
+# Rich markup for the static help panels, parsed once per panel
+HANDOFF_INFO_MARKUP = (
+    "[bold magenta]HANDOFF_TO_USER TOOL WORKFLOW[/bold magenta]\n\n"
+    "[white]This demo showcases two critical modes of the handoff_to_user tool:[/white]\n\n"
+    "[bold green]1. CONTINUE MODE (breakout_of_loop=False):[/bold green]\n"
+    "[green] - Agent pauses execution and prompts the user\n"
+    " - Agent waits for user input\n"
+    " - After receiving input, agent CONTINUES processing\n"
+    " - Used for the first 5 requirements sections and review[/green]\n\n"
+    "[bold yellow]2. BREAK MODE (breakout_of_loop=True):[/bold yellow]\n"
+    "[yellow] - Agent pauses execution and prompts the user\n"
+    " - Agent waits for user input\n"
+    " - After receiving input, agent STOPS execution completely\n"
+    " - Used for the additional information section to complete input gathering[/yellow]\n\n"
+    "[white]The workflow follows this pattern:[/white]\n"
+    "[cyan]Start -> Section 1 -> handoff(continue) -> Section 2 -> handoff(continue) -> \n"
+    "Section 3 -> handoff(continue) -> Section 4 -> handoff(continue) -> \n"
+    "Section 5 -> handoff(continue) -> Additional Info -> handoff(break) -> \n"
+    "Validation -> Document Generation -> Review -> handoff(continue) -> Save[/cyan]\n\n"
+    "[white]This creates a structured, section-by-section requirements gathering process\n"
+    "with human oversight at each critical decision point.[/white]"
+)
+
+@functools.lru_cache(maxsize=None)
+def _handoff_info_panel():
+    """Build the handoff_to_user workflow panel."""
+    handoff_text = Text.from_markup(HANDOFF_INFO_MARKUP)
+    return Panel(
         handoff_text,
         title="handoff_to_user Tool Workflow",
         title_align="center",
         border_style="magenta",
         padding=(1, 2)
-    ))
+    )
 
-def print_tools_info():
-    """Print information about the additional tools."""
-    tools_text = Text()
-    tools_text.append("REQUIREMENTS GATHERING TOOLS\n\n", style="bold blue")
-    
-    # handoff_to_user Tool
-    tools_text.append("1. HANDOFF_TO_USER TOOL\n", style="bold green")
-    tools_text.append(" Purpose: Enables interactive user input collection\n", style="green")
-    tools_text.append(" Usage: agent.tool.handoff_to_user(message=\"...\", breakout_of_loop=False/True)\n", style="green")
-    tools_text.append(" When Used: For collecting user input at each step of the process\n\n", style="green")
-    
-    # evaluate_confidence Tool
-    tools_text.append("2. EVALUATE_CONFIDENCE TOOL\n", style="bold yellow")
-    tools_text.append(" Purpose: Specialized agent for evaluating response quality\n", style="yellow")
-    tools_text.append(" Usage: agent.tool.evaluate_confidence(response=\"...\", section_name=\"...\")\n", style="yellow")
-    tools_text.append(" When Used: After collecting all responses to assess quality\n\n", style="yellow")
-    
-    # validate_response Tool
-    tools_text.append("3. VALIDATE_RESPONSE TOOL\n", style="bold blue")
-    tools_text.append(" Purpose: Specialized agent for identifying issues in responses\n", style="blue")
-    tools_text.append(" Usage: agent.tool.validate_response(response=\"...\", section_name=\"...\")\n", style="blue")
-    tools_text.append(" When Used: For responses with low confidence scores\n\n", style="blue")
-    
-    # generate_requirements_doc Tool
-    tools_text.append("4. GENERATE_REQUIREMENTS_DOC TOOL\n", style="bold green")
-    tools_text.append(" Purpose: Specialized agent for document generation\n", style="green")
-    tools_text.append(" Usage: agent.tool.generate_requirements_doc(project_name=\"...\", requirements_data=\"...\")\n", style="green")
-    tools_text.append(" When Used: After validation to create the final document\n\n", style="green")
-    
-    # Knowledge Base Tool
-    tools_text.append("5. KNOWLEDGE BASE TOOL\n", style="bold yellow")
-    tools_text.append(" Purpose: Retrieves relevant information from knowledge base\n", style="yellow")
-    tools_text.append(" Input: Query text to search for in the knowledge base\n", style="yellow")
-    tools_text.append(" Output: Relevant information from the knowledge base\n", style="yellow")
-    tools_text.append(" When Used: Before asking questions or providing guidance\n\n", style="yellow")
-    
-    # Enhanced Workflow
-    tools_text.append("AGENTS AS TOOLS PATTERN:\n", style="bold white")
-    tools_text.append("This system uses the 'Agents as Tools' pattern where specialized agents are wrapped\n", style="white")
-    tools_text.append("as callable functions that can be used by the main orchestrator agent. Each specialized\n", style="white")
-    tools_text.append("agent has a focused area of responsibility and expertise:\n\n", style="white")
-    tools_text.append("1. Main Agent: Orchestrates the overall requirements gathering process\n", style="cyan")
-    tools_text.append("2. Evaluation Agent: Analyzes response quality and provides confidence scores\n", style="cyan")
-    tools_text.append("3. Validation Agent: Identifies specific issues in low-quality responses\n", style="cyan")
-    tools_text.append("4. Document Generation Agent: Creates the final requirements document\n\n", style="cyan")
-    
-    tools_text.append("This creates an efficient requirements gathering process that leverages\n", style="white")
-    tools_text.append("specialized expertise for each task while maintaining a cohesive workflow.", style="white")
-    
-    console.print(Panel(
+def print_handoff_info():
+    """Print information about the handoff_to_user tool workflow."""
+    print_static(_handoff_info_panel())
+
+TOOLS_INFO_MARKUP = (
+    "[bold blue]REQUIREMENTS GATHERING TOOLS[/bold blue]\n\n"
+    "[bold green]1. HANDOFF_TO_USER TOOL[/bold green]\n"
+    "[green] Purpose: Enables interactive user input collection\n"
+    " Usage: agent.tool.handoff_to_user(message=\"...\", breakout_of_loop=False/True)\n"
+    " When Used: For collecting user input at each step of the process[/green]\n\n"
+    "[bold yellow]2. EVALUATE_CONFIDENCE TOOL[/bold yellow]\n"
+    "[yellow] Purpose: Specialized agent for evaluating response quality\n"
+    " Usage: agent.tool.evaluate_confidence(response=\"...\", section_name=\"...\")\n"
+    " When Used: After collecting all responses to assess quality[/yellow]\n\n"
+    "[bold blue]3. VALIDATE_RESPONSE TOOL[/bold blue]\n"
+    "[blue] Purpose: Specialized agent for identifying issues in responses\n"
+    " Usage: agent.tool.validate_response(response=\"...\", section_name=\"...\")\n"
+    " When Used: For responses with low confidence scores[/blue]\n\n"
+    "[bold green]4. GENERATE_REQUIREMENTS_DOC TOOL[/bold green]\n"
+    "[green] Purpose: Specialized agent for document generation\n"
+    " Usage: agent.tool.generate_requirements_doc(project_name=\"...\", requirements_data=\"...\")\n"
+    " When Used: After validation to create the final document[/green]\n\n"
+    "[bold yellow]5. KNOWLEDGE BASE TOOL[/bold yellow]\n"
+    "[yellow] Purpose: Retrieves relevant information from knowledge base\n"
+    " Input: Query text to search for in the knowledge base\n"
+    " Output: Relevant information from the knowledge base\n"
+    " When Used: Before asking questions or providing guidance[/yellow]\n\n"
+    "[bold white]AGENTS AS TOOLS PATTERN:[/bold white]\n"
+    "[white]This system uses the 'Agents as Tools' pattern where specialized agents are wrapped\n"
+    "as callable functions that can be used by the main orchestrator agent. Each specialized\n"
+    "agent has a focused area of responsibility and expertise:[/white]\n\n"
+    "[cyan]1. Main Agent: Orchestrates the overall requirements gathering process\n"
+    "2. Evaluation Agent: Analyzes response quality and provides confidence scores\n"
+    "3. Validation Agent: Identifies specific issues in low-quality responses\n"
+    "4. Document Generation Agent: Creates the final requirements document[/cyan]\n\n"
+    "[white]This creates an efficient requirements gathering process that leverages\n"
+    "specialized expertise for each task while maintaining a cohesive workflow.[/white]"
+)
+
+@functools.lru_cache(maxsize=None)
+def _tools_info_panel():
+    """Build the requirements tools panel."""
+    tools_text = Text.from_markup(TOOLS_INFO_MARKUP)
+    return Panel(
         tools_text,
         title="Enhanced Requirements Tools",
         title_align="center",
         border_style="blue",
         padding=(1, 2)
-    ))
+    )
 
-def print_kb_info():
-    """Print information about the knowledge base integration."""
-    kb_text = Text()
-    kb_text.append("KNOWLEDGE BASE INTEGRATION\n\n", style="bold blue")
-    kb_text.append("This system is enhanced with Amazon Bedrock Knowledge Base integration:\n\n", style="white")
-    kb_text.append("KNOWLEDGE BASE ID:\n", style="bold green")
-    kb_text.append(f" {KNOWLEDGE_BASE_ID}\n\n", style="green")
-    kb_text.append("AWS REGION:\n", style="bold green")
-    kb_text.append(f" {AWS_REGION}\n\n", style="green")
-    kb_text.append("HOW IT WORKS:\n", style="bold white")
-    kb_text.append("1. The agent queries the knowledge base for relevant information\n", style="white")
-    kb_text.append("2. Knowledge is incorporated into questions and suggestions\n", style="white")
-    kb_text.append("3. Requirements are enhanced with domain expertise\n", style="white")
-    kb_text.append("4. The final document includes best practices and standards\n\n", style="white")
-    kb_text.append("This creates a more informed requirements gathering process that leverages\n", style="cyan")
-    kb_text.append("existing knowledge and best practices in your domain.", style="cyan")
-    console.print(Panel(
+def print_tools_info():
+    """Print information about the additional tools."""
+    print_static(_tools_info_panel())
+
+# {kb_id} and {region} are filled in (escaped) per knowledge base
+KB_INFO_MARKUP = (
+    "[bold blue]KNOWLEDGE BASE INTEGRATION[/bold blue]\n\n"
+    "[white]This system is enhanced with Amazon Bedrock Knowledge Base integration:[/white]\n\n"
+    "[bold green]KNOWLEDGE BASE ID:[/bold green]\n"
+    "[green] {kb_id}[/green]\n\n"
+    "[bold green]AWS REGION:[/bold green]\n"
+    "[green] {region}[/green]\n\n"
+    "[bold white]HOW IT WORKS:[/bold white]\n"
+    "[white]1. The agent queries the knowledge base for relevant information\n"
+    "2. Knowledge is incorporated into questions and suggestions\n"
+    "3. Requirements are enhanced with domain expertise\n"
+    "4. The final document includes best practices and standards[/white]\n\n"
+    "[cyan]This creates a more informed requirements gathering process that leverages\n"
+    "existing knowledge and best practices in your domain.[/cyan]"
+)
+
+@functools.lru_cache(maxsize=4)
+def _kb_info_panel(kb_id, region):
+    """Build the knowledge base panel for a knowledge base ID and region."""
+    kb_text = Text.from_markup(KB_INFO_MARKUP.format(kb_id=escape(kb_id), region=escape(region)))
+    return Panel(
         kb_text,
         title="Knowledge Base Integration",
         title_align="center",
         border_style="blue",
         padding=(1, 2)
-    ))
+    )
+
+def print_kb_info():
+    """Print information about the knowledge base integration."""
+    print_static(_kb_info_panel(KNOWLEDGE_BASE_ID, AWS_REGION))
+
+# Info panels shown before each run mode starts, in order
+MODE_PANELS = {
+    "interactive": (print_handoff_info, print_tools_info),
+    "kb": (print_handoff_info, print_tools_info, print_kb_info),
+    "demo": (print_handoff_info, print_tools_info),
+    "demo_kb": (print_handoff_info, print_tools_info, print_kb_info),
+}
+
+def pause_for_reading():
+    """Give the user time to read the intro panels, if REQS_DELAY asks for it on a terminal."""
+    try:
+        delay = float(os.environ.get("REQS_DELAY", "0"))
+    except ValueError:
+        delay = 0.0
+    if delay > 0 and sys.stdout.isatty():
+        time.sleep(delay)
 
 def main():
     """Main entry point for the requirements gathering demo."""
-    # Check for knowledge base flag
-    use_kb = False
-    custom_kb_id = None
-    
-    # Process command line arguments
-    args = sys.argv[1:]
-    i = 0
-    while i < len(args):
-        if args[i] in ["--kb", "-k"]:
-            use_kb = True
-            # Check if next argument is a KB ID
-            if i + 1 < len(args) and not args[i+1].startswith("-"):
-                custom_kb_id = args[i+1]
-                i += 1  # Skip the next argument since we've processed it
-        i += 1
+    # Process command line arguments; --help is handled here so it prints our usage panel
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--kb", "-k", nargs="?", const=True, default=None)
+    parser.add_argument("--demo", "-d", action="store_true")
+    parser.add_argument("--help", "-h", action="store_true")
+    args, unknown_args = parser.parse_known_args()
+    use_kb = args.kb is not None
     
     # Update KB ID if provided
     global KNOWLEDGE_BASE_ID
-    if custom_kb_id:
-        KNOWLEDGE_BASE_ID = custom_kb_id
+    if isinstance(args.kb, str):
+        KNOWLEDGE_BASE_ID = args.kb
         console.print(f"[cyan]Using custom Knowledge Base ID: {KNOWLEDGE_BASE_ID}[/cyan]")
     
     # Handle command line arguments
-    if len(sys.argv) > 1:
-        if "--help" in sys.argv or "-h" in sys.argv:
-            print_usage()
-            return
-        elif "--demo" in sys.argv or "-d" in sys.argv:
-            print_handoff_info()
-            print_tools_info()
-            if use_kb:
-                print_kb_info()
-            time.sleep(1)  # Give user time to read the info
-            result = demo_with_sample_project(use_kb=use_kb)
-        elif use_kb:
-            print_handoff_info()
-            print_tools_info()
-            print_kb_info()
-            time.sleep(1)
-            result = gather_requirements(use_kb=use_kb)
-        else:
-            console.print(f"[red]Unknown argument: {' '.join(sys.argv[1:])}[/red]")
-            console.print("Use --help for usage information")
-            return
+    if args.help:
+        print_usage()
+        return
+    if unknown_args and not (args.demo or use_kb):
+        console.print(f"[red]Unknown argument: {' '.join(unknown_args)}[/red]")
+        console.print("Use --help for usage information")
+        return
+
+    if args.demo:
+        mode = "demo_kb" if use_kb else "demo"
+    else:
+        mode = "kb" if use_kb else "interactive"
+    for print_info in MODE_PANELS[mode]:
+        print_info()
+    pause_for_reading()
+
+    if args.demo:
+        result = demo_with_sample_project(use_kb=use_kb)
     else:
-        # Interactive mode
-        print_handoff_info()
-        print_tools_info()
-        time.sleep(1)  # Give user time to read the info
-        result = gather_requirements(use_kb=False)
+        result = gather_requirements(use_kb=use_kb)
     
-    # Print final result summary
+    # Print final result summary in a single write
+    summary = Text()
     if result.get("status") == "success":
-        console.print(f"\n[bold green]Requirements gathering completed successfully![/bold green]")
-        console.print(f"[green]Project: {result.get('project_name', 'Unknown')}[/green]")
-        console.print(f"[green]Document: {result.get('saved_filename', 'Not saved')}[/green]")
-        console.print(f"[green]Sections: {result.get('statistics', {}).get('sections_processed', 0)}[/green]")
-        console.print(f"[green]Responses: {result.get('statistics', {}).get('total_responses', 0)}[/green]")
-        console.print(f"[green]Overall Confidence: {result.get('statistics', {}).get('overall_confidence', 0):.1f}/10[/green]")
-        if result.get('statistics', {}).get('kb_enhanced', False):
-            console.print(f"[green]Knowledge Base Enhanced: Yes[/green]")
+        statistics = result.get('statistics', {})
+        summary.append("\nRequirements gathering completed successfully!\n", style="bold green")
+        summary.append(f"Project: {result.get('project_name', 'Unknown')}\n", style="green")
+        summary.append(f"Document: {result.get('saved_filename', 'Not saved')}\n", style="green")
+        summary.append(f"Sections: {statistics.get('sections_processed', 0)}\n", style="green")
+        summary.append(f"Responses: {statistics.get('total_responses', 0)}\n", style="green")
+        summary.append(f"Overall Confidence: {statistics.get('overall_confidence', 0):.1f}/10\n", style="green")
+        if statistics.get('kb_enhanced', False):
+            summary.append("Knowledge Base Enhanced: Yes\n", style="green")
     elif result.get("status") == "interrupted":
-        console.print(f"\n[yellow]Session was interrupted but partial data may be available.[/yellow]")
+        summary.append("\nSession was interrupted but partial data may be available.\n", style="yellow")
     else:
-        console.print(f"\n[red]Requirements gathering failed.[/red]")
+        summary.append("\nRequirements gathering failed.\n", style="red")
         if "error" in result:
-            console.print(f"[red]Error: {result['error']}[/red]")
+            summary.append(f"Error: {result['error']}\n", style="red")
     
-    console.print(f"\n[dim]Thank you for using the Requirements Gathering System![/dim]")
+    summary.append("\nThank you for using the Requirements Gathering System!", style="dim")
+    console.print(summary)
 
     # Explicitly exit to ensure the process doesn't continue
     sys.exit(0)
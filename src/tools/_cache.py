@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Content-Addressed Result Cache for the Requirements Tools
+
+Tool results are stored on disk under a hash of the inputs that produced
+them, so an identical request is answered without another LLM call.
+Results expire after REQUIREMENTS_CACHE_TTL seconds.
+"""
+
+import hashlib
+import importlib.metadata
+import os
+import tempfile
+import time
+from pathlib import Path
+
+CACHE_DIR = Path(os.environ.get("REQUIREMENTS_CACHE_DIR", Path.home() / ".cache" / "hitl"))
+
+# Seconds a result stays valid; a value that isn't a number keeps the 7-day default
+DEFAULT_CACHE_TTL = 7 * 24 * 60 * 60
+try:
+    CACHE_TTL = float(os.environ.get("REQUIREMENTS_CACHE_TTL", DEFAULT_CACHE_TTL))
+except ValueError:
+    CACHE_TTL = DEFAULT_CACHE_TTL
+
+# The tool agents use the Strands default model, which can change with the Strands release
+try:
+    _MODEL_VERSION = importlib.metadata.version("strands-agents")
+except importlib.metadata.PackageNotFoundError:
+    _MODEL_VERSION = "unknown"
+
+def content_key(*parts):
+    """
+    Return a stable key for a combination of inputs and the model version.
+    
+    Args:
+        *parts (str): The inputs the cached result depends on, including the agent's prompt
+        
+    Returns:
+        Hex digest identifying the inputs
+    """
+    return hashlib.blake2b("\x1f".join((_MODEL_VERSION, *parts)).encode("utf-8"), digest_size=16).hexdigest()
+
+def read_result(namespace, key):
+    """Return the cached result for a key, or None if there isn't one or it has expired."""
+    path = CACHE_DIR / namespace / f"{key}.json"
+    try:
+        if time.time() - path.stat().st_mtime >= CACHE_TTL:
+            return None
+        return path.read_text(encoding="utf-8")
+    except OSError:
+        return None
+
+def write_result(namespace, key, result):
+    """Store a result for a key; the file is replaced atomically so readers never see part of it."""
+    directory = CACHE_DIR / namespace
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(result)
+            os.replace(tmp_path, directory / f"{key}.json")
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except OSError:
+        # A cache that can't be written only costs a repeat call later
+        pass
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+JSON Extraction for the Requirements Tools
+
+The tool agents are asked to answer with a JSON object, which may arrive
+wrapped in prose or a code fence; this pulls the object out and parses it.
+"""
+
+import json
+
+_decoder = json.JSONDecoder()
+
+def _find_json(text, opener, kind):
+    """Return the first value of the given type that parses from an opener character onwards, or None."""
+    start = text.find(opener)
+    while start != -1:
+        try:
+            parsed, _ = _decoder.raw_decode(text, start)
+        except ValueError:
+            parsed = None
+        if isinstance(parsed, kind):
+            return parsed
+        start = text.find(opener, start + 1)
+    return None
+
+def parse_json_object(text, default):
+    """
+    Parse the first JSON object embedded in an LLM response.
+    
+    Args:
+        text (str): The LLM response
+        default (dict): Returned (as a copy) when no object can be parsed
+        
+    Returns:
+        Dict parsed from the response
+    """
+    parsed = _find_json(text, "{", dict)
+    return parsed if parsed is not None else dict(default)
+
+def parse_json_array(text):
+    """
+    Parse the first JSON array embedded in an LLM response.
+    
+    Args:
+        text (str): The LLM response
+        
+    Returns:
+        List parsed from the response, or an empty list if there isn't one
+    """
+    parsed = _find_json(text, "[", list)
+    return parsed if parsed is not None else []
@@ -6,22 +6,92 @@ This tool uses the LLM to evaluate the quality of user responses
 rather than using hardcoded logic.
 """
 
+import asyncio
+import functools
+import threading
+
 from strands import Agent
 
+from ._cache import content_key, read_result, write_result
+from ._parsing import parse_json_array, parse_json_object
+
 def evaluate_confidence(response, section_name):
     """
     Evaluate the confidence level in a user's requirements response using LLM.
     
+    Identical requests are answered from a cache on disk until it expires.
+    
     Args:
         response (str): The user's response text to evaluate
         section_name (str): The section being evaluated (e.g., "Project Scope")
         
     Returns:
-        Dict containing evaluation results
+        Dict containing evaluation results, with the agent's reply text under raw_response
+    """
+    evaluation = _cached_eval(content_key(_EVAL_PROMPT, section_name, response), section_name, response)
+    return {
+        **_default_evaluation(section_name, evaluation),
+        **parse_json_object(evaluation, {}),
+        "raw_response": evaluation
+    }
+
+def _default_evaluation(section_name, feedback):
+    """Return the evaluation used for any key the agent's reply leaves out."""
+    return {
+        "confidence_score": 0.0,
+        "feedback": feedback,
+        "strengths": [],
+        "weaknesses": [],
+        "section": section_name
+    }
+
+def evaluate_confidence_batch(responses):
     """
-    # Create a temporary agent to evaluate the response
-    evaluation_agent = Agent(
-        system_prompt=f"""You are an expert requirements analyst.
+    Evaluate several sections' responses with a single LLM call.
+    
+    Sends every response in one request, so the instructions and the round trip
+    are paid once rather than per section. Any section missing from the reply is
+    evaluated on its own.
+    
+    Args:
+        responses (list): (section_name, response) pairs to evaluate
+        
+    Returns:
+        List of evaluation dicts, one per pair and in the same order
+    """
+    pairs = tuple((section_name, response) for section_name, response in responses)
+    if not pairs:
+        return []
+    
+    evaluations = _cached_batch_eval(content_key(_BATCH_EVAL_PROMPT, *(part for pair in pairs for part in pair)), pairs)
+    parsed = [item for item in parse_json_array(evaluations) if isinstance(item, dict)]
+    
+    # Match evaluations to sections by name; position is only trusted for unnamed items
+    # when the counts agree. A section the reply leaves out is evaluated on its own.
+    by_section = {item["section"]: item for item in parsed if isinstance(item.get("section"), str)}
+    by_position = len(parsed) == len(pairs)
+    results = []
+    for index, (section_name, response) in enumerate(pairs):
+        item = by_section.get(section_name)
+        if item is None and by_position and not parsed[index].get("section"):
+            item = parsed[index]
+        if item is None:
+            results.append(evaluate_confidence(response, section_name))
+        else:
+            results.append({**_default_evaluation(section_name, ""), **item, "section": section_name})
+    return results
+
+async def evaluate_confidence_async(response, section_name):
+    """
+    Run evaluate_confidence in a worker thread so several can be awaited together.
+    
+    For example, ``await asyncio.gather(*(evaluate_confidence_async(r, s) for r, s in pairs))``
+    overlaps the LLM round trips of every section.
+    """
+    return await asyncio.to_thread(evaluate_confidence, response, section_name)
+
+# Agent instructions; they are part of each cache key, so editing them invalidates old results
+_EVAL_PROMPT = """You are an expert requirements analyst.
         
         Evaluate the quality and completeness of the user's response for the "{section_name}" section.
         
@@ -38,13 +108,83 @@ def evaluate_confidence(response, section_name):
         - weaknesses: list of strings
         - section: string (the section name)
         """
+
+_BATCH_EVAL_PROMPT = """You are an expert requirements analyst.
+        
+        You will receive responses for several requirements sections. Evaluate the
+        quality and completeness of each response for its section.
+        
+        For each section provide:
+        1. A confidence score from 0-10 (where 10 is excellent)
+        2. Brief feedback explaining the score
+        3. 1-3 key strengths of the response
+        4. 1-3 areas for improvement
+        
+        Return a JSON array with one object per section, in the order given, with these keys:
+        - section: string (the section name, exactly as given)
+        - confidence_score: float
+        - feedback: string
+        - strengths: list of strings
+        - weaknesses: list of strings
+        """
+
+# One lock per cached agent, as agents can't serve overlapping requests
+_AGENT_LOCKS = {}
+
+@functools.lru_cache(maxsize=16)
+def _get_eval_agent(section_name):
+    """Return the evaluation agent for a section name, building it only once."""
+    return Agent(
+        system_prompt=_EVAL_PROMPT.format(section_name=section_name),
+        callback_handler=None
+    )
+
+@functools.lru_cache(maxsize=1)
+def _get_batch_eval_agent():
+    """Return the agent that evaluates several sections at once, building it only once."""
+    return Agent(
+        system_prompt=_BATCH_EVAL_PROMPT,
+        callback_handler=None
     )
+
+def _cached_batch_eval(key_hash, pairs):
+    """Return the raw batch evaluation stored under key_hash, running it only if it isn't cached on disk."""
+    cached = read_result("eval_batch", key_hash)
+    if cached is not None:
+        return cached
     
-    # Have the LLM evaluate the response
-    evaluation = evaluation_agent.query(
-        f"Please evaluate this response for the '{section_name}' section:\n\n{response}"
+    request = "".join(
+        f"Section: {section_name}\nResponse:\n{response}\n\n" for section_name, response in pairs
     )
+    batch_agent = _get_batch_eval_agent()
+    with _AGENT_LOCKS.setdefault(("batch",), threading.Lock()):
+        batch_agent.messages.clear()
+        evaluations = batch_agent(
+            f"Please evaluate these {len(pairs)} section responses:\n\n{request}"
+        )
+    
+    evaluations = str(evaluations)
+    write_result("eval_batch", key_hash, evaluations)
+    return evaluations
+
+def _cached_eval(key_hash, section_name, response):
+    """Return the raw evaluation stored under key_hash, running it only if it isn't cached on disk."""
+    cached = read_result("eval", key_hash)
+    if cached is not None:
+        return cached
+    
+    # Reuse the agent for this section name; each request stands alone, so drop earlier turns.
+    # The agent handles one request at a time, so concurrent callers take turns.
+    evaluation_agent = _get_eval_agent(section_name)
+    with _AGENT_LOCKS.setdefault(section_name, threading.Lock()):
+        evaluation_agent.messages.clear()
+        
+        # Have the LLM evaluate the response
+        evaluation = evaluation_agent(
+            f"Please evaluate this response for the '{section_name}' section:\n\n{response}"
+        )
     
-    # The LLM should return a JSON object, but we'll handle it as a string
-    # In a production system, you'd want to parse this properly
+    # Keep the raw text; evaluate_confidence parses the JSON object out of it
+    evaluation = str(evaluation)
+    write_result("eval", key_hash, evaluation)
     return evaluation 
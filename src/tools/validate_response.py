@@ -5,22 +5,49 @@ Response Validation Tool for Requirements Gathering
 This tool uses the LLM to validate user responses and suggest improvements.
 """
 
+import asyncio
+import functools
+import threading
+
 from strands import Agent
 
+from ._cache import content_key, read_result, write_result
+from ._parsing import parse_json_object
+
 def validate_response(response, requirements_type):
     """
     Validate a user response and identify issues or suggest improvements.
     
+    Identical requests are answered from a cache on disk until it expires.
+    
     Args:
         response (str): The user's response to validate
         requirements_type (str): The type of requirements being validated
         
     Returns:
-        Dict containing validation results
+        Dict containing validation results, with the agent's reply text under raw_response
+    """
+    validation = _cached_validation(content_key(_VALIDATION_PROMPT, requirements_type, response), requirements_type, response)
+    return {
+        "issues_found": False,
+        "missing_elements": [],
+        "clarification_needed": [],
+        "follow_up_questions": [],
+        **parse_json_object(validation, {}),
+        "raw_response": validation
+    }
+
+async def validate_response_async(response, requirements_type):
+    """
+    Run validate_response in a worker thread so several can be awaited together.
+    
+    For example, ``await asyncio.gather(*(validate_response_async(r, s) for r, s in pairs))``
+    overlaps the LLM round trips of every section.
     """
-    # Create a temporary agent to validate the response
-    validation_agent = Agent(
-        system_prompt=f"""You are an expert requirements validator for {requirements_type} requirements.
+    return await asyncio.to_thread(validate_response, response, requirements_type)
+
+# Agent instructions; they are part of each cache key, so editing them invalidates old results
+_VALIDATION_PROMPT = """You are an expert requirements validator for {requirements_type} requirements.
         
         Analyze the user's response and identify:
         1. Any missing critical information
@@ -33,13 +60,36 @@ def validate_response(response, requirements_type):
         - clarification_needed: list of strings
         - follow_up_questions: list of strings
         """
+
+# One lock per cached agent, as agents can't serve overlapping requests
+_AGENT_LOCKS = {}
+
+@functools.lru_cache(maxsize=16)
+def _get_validation_agent(requirements_type):
+    """Return the validation agent for a requirements type, building it only once."""
+    return Agent(
+        system_prompt=_VALIDATION_PROMPT.format(requirements_type=requirements_type),
+        callback_handler=None
     )
+
+def _cached_validation(key_hash, requirements_type, response):
+    """Return the raw validation stored under key_hash, running it only if it isn't cached on disk."""
+    cached = read_result("validate", key_hash)
+    if cached is not None:
+        return cached
     
-    # Have the LLM validate the response
-    validation = validation_agent.query(
-        f"Please validate this {requirements_type} requirements response:\n\n{response}"
-    )
+    # Reuse the agent for this requirements type; each request stands alone, so drop earlier turns.
+    # The agent handles one request at a time, so concurrent callers take turns.
+    validation_agent = _get_validation_agent(requirements_type)
+    with _AGENT_LOCKS.setdefault(requirements_type, threading.Lock()):
+        validation_agent.messages.clear()
+        
+        # Have the LLM validate the response
+        validation = validation_agent(
+            f"Please validate this {requirements_type} requirements response:\n\n{response}"
+        )
     
-    # The LLM should return a JSON object, but we'll handle it as a string
-    # In a production system, you'd want to parse this properly
+    # Keep the raw text; validate_response parses the JSON object out of it
+    validation = str(validation)
+    write_result("validate", key_hash, validation)
     return validation 
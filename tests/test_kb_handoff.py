@@ -3,19 +3,48 @@
 Unit tests for the KB chatbot with handoff_to_user functionality
 """
 
+import asyncio
 import os
 import sys
 from unittest import mock
 
 import pytest
 import boto3
+import httpx
 from botocore.exceptions import ClientError
 
 # Add parent directory to path to import from src
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 # Now import our modules
-from src.kb_chatbot_example import main, query_knowledge_base
+from src import kb_chatbot_example
+from src.kb_chatbot_example import (
+    main,
+    query_knowledge_base,
+    query_knowledge_base_async,
+    query_knowledge_base_batch,
+    query_knowledge_base_as_completed,
+    prime_cache,
+)
+
+
+def _clear_kb_state():
+    kb_chatbot_example._get_bedrock_client.cache_clear()
+    kb_chatbot_example._credentials = None
+    kb_chatbot_example._static_signer = None
+    kb_chatbot_example._kb_cache.clear()
+    kb_chatbot_example._breaker_open_until = 0.0
+    kb_chatbot_example._record_success()
+
+
+@pytest.fixture(autouse=True)
+def reset_kb_state():
+    """Clear the module-level client, result cache and breaker around each test"""
+    _clear_kb_state()
+    # Keep main() from warming the cache against the real API
+    with mock.patch.object(kb_chatbot_example, "WARM_CACHE_QUERIES", ()):
+        yield
+    _clear_kb_state()
 
 
 @pytest.fixture
@@ -83,6 +112,131 @@ class TestKnowledgeBaseQuery:
         assert "Source 1:" in result
         assert "Source 2:" in result
     
+    def test_client_targets_agent_runtime(self):
+        """Test the Retrieve client is built for the agent runtime service"""
+        with mock.patch('boto3.client') as mock_client:
+            kb_chatbot_example._get_bedrock_client()
+        
+        assert mock_client.call_args.args[0] == 'bedrock-agent-runtime'
+    
+    def test_query_knowledge_base_cached(self, mock_bedrock_agent):
+        """Test that repeated queries are served from the cache"""
+        first = query_knowledge_base("Test  Query")
+        second = query_knowledge_base("test query")
+        
+        # Only the first call should reach the API
+        mock_bedrock_agent.retrieve.assert_called_once()
+        assert first == second
+    
+    def test_query_knowledge_base_async(self, monkeypatch):
+        """Test the async path signs and posts the Retrieve request"""
+        monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+        monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+        sent_requests = []
+        
+        def handler(request):
+            sent_requests.append(request)
+            return httpx.Response(200, json={
+                'retrievalResults': [{'content': {'text': 'Async content from the KB.'}}]
+            })
+        
+        monkeypatch.setattr(
+            kb_chatbot_example, "_get_http_client",
+            lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        )
+        
+        result = asyncio.run(query_knowledge_base_async("test query"))
+        
+        assert "Source 1:\nAsync content from the KB." in result
+        assert sent_requests[0].url.path.endswith("/retrieve")
+        assert sent_requests[0].headers["Authorization"].startswith("AWS4-HMAC-SHA256")
+    
+    def test_query_knowledge_base_batch(self, monkeypatch):
+        """Test batched queries come back in the order they were asked"""
+        async def fake_query(query):
+            return f"result for {query}"
+        
+        monkeypatch.setattr(kb_chatbot_example, "query_knowledge_base_async", fake_query)
+        
+        results = asyncio.run(query_knowledge_base_batch(["first", "second"]))
+        
+        assert results == ["result for first", "result for second"]
+    
+    def test_as_completed_yields_in_completion_order(self, monkeypatch):
+        """Test lookups are yielded with their query as each one finishes"""
+        delays = {"slow": 0.05, "fast": 0.0}
+        
+        async def fake_query(query):
+            await asyncio.sleep(delays[query])
+            return f"result for {query}"
+        
+        monkeypatch.setattr(kb_chatbot_example, "query_knowledge_base_async", fake_query)
+        
+        async def collect():
+            return [pair async for pair in query_knowledge_base_as_completed(["slow", "fast"])]
+        
+        assert asyncio.run(collect()) == [("fast", "result for fast"), ("slow", "result for slow")]
+    
+    def test_prime_cache(self, monkeypatch):
+        """Test priming looks up every anticipated query"""
+        seen = []
+        
+        async def fake_query(query):
+            seen.append(query)
+            return f"result for {query}"
+        
+        monkeypatch.setattr(kb_chatbot_example, "query_knowledge_base_async", fake_query)
+        
+        asyncio.run(prime_cache(["first", "second"]))
+        
+        assert sorted(seen) == ["first", "second"]
+    
+    def test_prime_cache_closes_http_client(self, monkeypatch):
+        """Test priming closes the HTTP client it opened before its loop exits"""
+        clients = []
+        
+        async def fake_query(query):
+            clients.append(kb_chatbot_example._get_http_client())
+            return f"result for {query}"
+        
+        monkeypatch.setattr(kb_chatbot_example, "query_knowledge_base_async", fake_query)
+        
+        asyncio.run(prime_cache(["first"]))
+        
+        assert clients[0].is_closed
+        assert not kb_chatbot_example._http_clients
+    
+    def test_main_skips_priming_without_queries(self, mock_agent, monkeypatch):
+        """Test main() only primes the cache when warm-up queries are configured"""
+        monkeypatch.setattr(sys, "argv", ["kb_chatbot_example.py"])
+        
+        with mock.patch.object(kb_chatbot_example, 'prime_cache') as mock_prime, \
+             mock.patch('builtins.print'):
+            main()
+        
+        mock_prime.assert_not_called()
+    
+    def test_missing_credentials_are_not_cached(self):
+        """Test credentials found after a failed lookup are picked up on the next request"""
+        with mock.patch('boto3.Session') as mock_session:
+            mock_session.return_value.get_credentials.side_effect = [None, mock.sentinel.credentials]
+            
+            assert kb_chatbot_example._get_credentials() is None
+            assert kb_chatbot_example._get_credentials() is mock.sentinel.credentials
+            assert kb_chatbot_example._get_credentials() is mock.sentinel.credentials
+        
+        assert mock_session.return_value.get_credentials.call_count == 2
+    
+    def test_long_results_are_truncated(self, mock_bedrock_agent):
+        """Test very long source text is cut down before formatting"""
+        mock_bedrock_agent.retrieve.return_value = {
+            'retrievalResults': [{'content': {'text': 'x' * 10000}}]
+        }
+        
+        result = query_knowledge_base("long query")
+        
+        assert result.count('x') == kb_chatbot_example.KB_RESULT_MAX_CHARS
+    
     def test_kb_error_handling(self, mock_bedrock_agent):
         """Test error handling in knowledge base queries"""
         # Configure mock to raise an exception
@@ -97,6 +251,20 @@ class TestKnowledgeBaseQuery:
         # Verify error handling
         assert "Error querying knowledge base" in result
         assert "ResourceNotFoundException" in result
+    
+    def test_breaker_skips_api_after_repeated_failures(self, mock_bedrock_agent):
+        """Test the API is not called while the circuit breaker is open"""
+        mock_bedrock_agent.retrieve.side_effect = ClientError(
+            {'Error': {'Code': 'ThrottlingException', 'Message': 'Rate exceeded'}},
+            'retrieve'
+        )
+        
+        for _ in range(kb_chatbot_example.KB_BREAKER_THRESHOLD):
+            query_knowledge_base("test query")
+        result = query_knowledge_base("test query")
+        
+        assert mock_bedrock_agent.retrieve.call_count == kb_chatbot_example.KB_BREAKER_THRESHOLD
+        assert result == kb_chatbot_example._degraded_result()
 
 
 class TestHandoffFunctionality:
@@ -0,0 +1,740 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the requirements gathering demo helpers
+"""
+
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from unittest import mock
+
+import pytest
+
+# Add parent directory to path to import from src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Now import our modules
+from src import requirements_demo
+
+
+class TestAwsClients:
+    """Test cases for the cached AWS client factories"""
+    
+    @pytest.fixture
+    def mock_session(self):
+        """Fixture to mock the shared boto3 session and start with no cached clients"""
+        requirements_demo._get_aws_client.cache_clear()
+        with mock.patch.object(requirements_demo, 'get_aws_session') as mock_session:
+            yield mock_session.return_value
+        requirements_demo._get_aws_client.cache_clear()
+    
+    def test_kb_client_targets_agent_runtime(self, mock_session):
+        """Test the Retrieve client is built for the agent runtime service"""
+        requirements_demo.get_bedrock_agent_client()
+        
+        assert mock_session.client.call_args.args[0] == 'bedrock-agent-runtime'
+    
+    def test_default_region_shares_client(self, mock_session):
+        """Test calls with and without the default region get the same client"""
+        mock_session.client.side_effect = lambda *args, **kwargs: mock.MagicMock()
+        
+        client = requirements_demo.get_bedrock_agent_client()
+        
+        assert requirements_demo.get_bedrock_agent_client(requirements_demo.AWS_REGION) is client
+        assert requirements_demo.get_bedrock_agent_client("us-west-2") is not client
+        assert mock_session.client.call_count == 2
+
+class TestRequirementsStorage:
+    """Test cases for checking and prewarming the requirements table"""
+    
+    @pytest.fixture
+    def mock_dynamodb(self):
+        """Fixture to mock the DynamoDB resource and forget any known table"""
+        with mock.patch.object(requirements_demo, 'get_dynamodb_resource') as mock_resource, \
+             mock.patch.object(requirements_demo, '_requirements_table', None), \
+             mock.patch.object(requirements_demo, 'console'):
+            yield mock_resource.return_value
+    
+    @staticmethod
+    def _missing_table():
+        from botocore.exceptions import ClientError
+        return ClientError({'Error': {'Code': 'ResourceNotFoundException', 'Message': 'missing'}}, 'DescribeTable')
+    
+    def test_prewarm_check_is_reused_by_save(self, mock_dynamodb):
+        """Test the save doesn't describe the table again after the prewarm found it"""
+        requirements_demo.prewarm_storage()
+        table = requirements_demo._ensure_requirements_table()
+        
+        mock_dynamodb.meta.client.describe_table.assert_called_once()
+        assert table is mock_dynamodb.Table.return_value
+    
+    def test_prewarm_does_not_create_table(self, mock_dynamodb):
+        """Test a missing table is only created once the user saves"""
+        mock_dynamodb.meta.client.describe_table.side_effect = self._missing_table()
+        
+        requirements_demo.prewarm_storage()
+        mock_dynamodb.create_table.assert_not_called()
+        
+        table = requirements_demo._ensure_requirements_table()
+        
+        mock_dynamodb.create_table.assert_called_once()
+        assert table is mock_dynamodb.create_table.return_value
+
+class TestSplitCategorizedInfo:
+    """Test cases for splitting categorized additional information by section"""
+    
+    def test_plain_headers(self):
+        """Test each header's content runs up to the next header"""
+        text = "PROJECT SCOPE: Add offline mode.\nMore scope.\nUSER STORIES: Admins export reports."
+        
+        assert requirements_demo.split_categorized_info(text) == [
+            ("PROJECT SCOPE", "Add offline mode.\nMore scope."),
+            ("USER STORIES", "Admins export reports."),
+        ]
+    
+    @pytest.mark.parametrize("header", [
+        '"PROJECT SCOPE:',
+        '**PROJECT SCOPE:**',
+        '**PROJECT SCOPE**:',
+        '- PROJECT SCOPE:',
+        '## PROJECT SCOPE:',
+        '> PROJECT SCOPE:',
+        '  PROJECT SCOPE:',
+    ])
+    def test_decorated_headers(self, header):
+        """Test quoted, bold, bulleted, heading and indented headers are recognised"""
+        closing = '"' if header.startswith('"') else ""
+        text = f"Here you go:\n{header} Support offline use.{closing}\n- SUCCESS CRITERIA: 99% uptime"
+        
+        assert requirements_demo.split_categorized_info(text) == [
+            ("PROJECT SCOPE", "Support offline use."),
+            ("SUCCESS CRITERIA", "99% uptime"),
+        ]
+    
+    def test_no_headers(self):
+        """Test text without section headers yields nothing"""
+        assert requirements_demo.split_categorized_info("Nothing to categorize.") == []
+    
+    def test_header_mid_sentence_is_ignored(self):
+        """Test a section name inside a sentence doesn't start a new section"""
+        text = "USER STORIES: Users see the PROJECT SCOPE: summary page."
+        
+        assert requirements_demo.split_categorized_info(text) == [
+            ("USER STORIES", "Users see the PROJECT SCOPE: summary page."),
+        ]
+
+
+class TestExtractConfidenceScore:
+    """Test cases for extracting confidence scores from evaluation text"""
+    
+    def test_labelled_score_takes_precedence(self):
+        """Test an explicit "Confidence score:" wins over an earlier X/10"""
+        text = "Clarity 4/10, completeness is good.\nConfidence score: 8"
+        
+        assert requirements_demo.extract_confidence_score(text) == 8.0
+    
+    def test_out_of_ten_fallback(self):
+        """Test an X/10 rating is used when no score is labelled"""
+        assert requirements_demo.extract_confidence_score("I'd rate this 6.5/10.") == 6.5
+    
+    def test_case_insensitive_label(self):
+        """Test labels match regardless of case"""
+        assert requirements_demo.extract_confidence_score("SCORE: 9") == 9.0
+    
+    def test_default_and_bounds(self):
+        """Test the default for unscored text and clamping to 0-10"""
+        assert requirements_demo.extract_confidence_score("No rating here.") == 7.0
+        assert requirements_demo.extract_confidence_score("Score: 12") == 10.0
+    
+    def test_tool_result_dict(self):
+        """Test scores are read from a tool result's text content"""
+        result = {"content": [{"text": "Confidence: 3"}]}
+        
+        assert requirements_demo.extract_confidence_score(result) == 3.0
+        assert requirements_demo.extract_confidence_score({"status": "error"}) == 7.0
+
+
+class TestCheapScore:
+    """Test cases for local scoring of responses"""
+    
+    SCOPE_WORDS = "The goal is a deliverable for each stakeholder"
+    
+    def _response(self, word_count, lead=SCOPE_WORDS):
+        """Build a response of the given length starting with section vocabulary"""
+        words = lead.split()
+        return " ".join(words + ["detail"] * (word_count - len(words)))
+    
+    def test_detailed_response_passes(self):
+        """Test long responses using enough section vocabulary get the full local score"""
+        score, matched = requirements_demo._cheap_score(self._response(60), "Project Scope")
+        
+        assert score == requirements_demo.CHEAP_SCORE
+        assert matched == 3
+    
+    def test_off_topic_response_fails(self):
+        """Test long responses without the section's vocabulary stay below the full score"""
+        score, matched = requirements_demo._cheap_score(self._response(60, "unrelated words"), "PROJECT SCOPE")
+        
+        assert matched == 0
+        assert score < requirements_demo.CHEAP_SCORE
+    
+    def test_boundaries(self):
+        """Test the word and keyword minimums are inclusive"""
+        min_words = requirements_demo.CHEAP_SCORE_MIN_WORDS
+        
+        at_bar, _ = requirements_demo._cheap_score(self._response(min_words), "PROJECT SCOPE")
+        short, _ = requirements_demo._cheap_score(self._response(min_words - 1), "PROJECT SCOPE")
+        two_keywords, matched = requirements_demo._cheap_score(
+            self._response(min_words, "The goal is a deliverable"), "PROJECT SCOPE"
+        )
+        
+        assert at_bar == requirements_demo.CHEAP_SCORE
+        assert short < requirements_demo.CHEAP_SCORE
+        assert matched == 2 and two_keywords < requirements_demo.CHEAP_SCORE
+
+
+class TestEvaluateConfidence:
+    """Test cases for choosing between local and agent evaluation"""
+    
+    STUFFED = " ".join(["goal scope deliverable stakeholder"] * 15)
+    
+    @pytest.fixture
+    def mock_specialist(self):
+        """Fixture to mock the evaluation agent and bypass the tool cache"""
+        cache = mock.MagicMock()
+        cache.get.return_value = None
+        with mock.patch.object(requirements_demo, 'ask_specialist', return_value="Confidence Score: 3/10") as ask, \
+             mock.patch.object(requirements_demo, 'get_tool_cache', return_value=cache), \
+             mock.patch.object(requirements_demo, 'console'):
+            yield ask
+    
+    def test_keyword_stuffing_is_evaluated(self, mock_specialist):
+        """Test vocabulary-heavy responses still go to the evaluation agent by default"""
+        result = requirements_demo.evaluate_confidence(self.STUFFED, "PROJECT SCOPE")
+        
+        mock_specialist.assert_called_once()
+        assert result == "Confidence Score: 3/10"
+    
+    def test_skip_llm_eval_scores_locally(self, mock_specialist):
+        """Test REQ_DEMO_SKIP_LLM_EVAL scores responses without the evaluation agent"""
+        with mock.patch.object(requirements_demo, 'SKIP_LLM_EVAL', True):
+            result = requirements_demo.evaluate_confidence(self.STUFFED, "PROJECT SCOPE")
+        
+        mock_specialist.assert_not_called()
+        assert requirements_demo.extract_confidence_score(result) == requirements_demo.CHEAP_SCORE
+    
+    def test_short_response_skips_agent(self, mock_specialist):
+        """Test very short responses get the fixed low score"""
+        result = requirements_demo.evaluate_confidence("Not sure", "PROJECT SCOPE")
+        
+        mock_specialist.assert_not_called()
+        assert requirements_demo.extract_confidence_score(result) == requirements_demo.SHORT_RESPONSE_SCORE
+
+
+class TestPauseForReading:
+    """Test cases for the optional pause after the intro panels"""
+    
+    @pytest.mark.parametrize("value, expected", [("1.5", [1.5]), ("0", []), ("soon", []), ("", [])])
+    def test_delay_parsing(self, monkeypatch, value, expected):
+        """Test valid delays pause on a terminal and invalid ones are treated as 0"""
+        monkeypatch.setenv("REQS_DELAY", value)
+        monkeypatch.setattr(sys.stdout, "isatty", lambda: True)
+        
+        with mock.patch.object(requirements_demo.time, 'sleep') as mock_sleep:
+            requirements_demo.pause_for_reading()
+        
+        assert [call.args[0] for call in mock_sleep.call_args_list] == expected
+
+
+class TestExtractUserText:
+    """Test cases for reading the user's reply from a handoff result"""
+    
+    def test_strips_tool_prefix(self):
+        """Test the handoff tool's prefix is removed"""
+        result = {"content": [{"text": "User response received: Yes, save it"}]}
+        
+        assert requirements_demo._extract_user_text(result) == "Yes, save it"
+    
+    def test_text_without_prefix(self):
+        """Test replies without the prefix are returned unchanged"""
+        result = {"content": [{"text": "User response received"}]}
+        
+        assert requirements_demo._extract_user_text(result) == "User response received"
+
+
+class TestSaveRequirementsRecord:
+    """Test cases for saving a requirements document to DynamoDB and S3"""
+    
+    RESPONSES = {"PROJECT SCOPE": "Build an offline editor", "USER STORIES": "Writers draft notes"}
+    SCORES = {"PROJECT SCOPE": 8.0, "USER STORIES": 6.5}
+    
+    def _save(self, table):
+        requirements_demo.save_requirements_record(
+            table, "Note App", "20260101_120000", "# Document", self.RESPONSES, self.SCORES, 7.25
+        )
+    
+    def test_document_stored_inline(self):
+        """Test the metadata item holds the document and each section gets its own row"""
+        table = mock.MagicMock()
+        with mock.patch.object(requirements_demo, 'REQUIREMENTS_BUCKET', None):
+            self._save(table)
+        
+        item = table.put_item.call_args.kwargs["Item"]
+        assert item["project_id"] == "note_app"
+        assert item["document"] == "# Document"
+        assert item["confidence_score"] == Decimal("7.25")
+        assert item["sections"] == {"PROJECT SCOPE": Decimal("8.0"), "USER STORIES": Decimal("6.5")}
+        assert table.put_item.call_args.kwargs["ConditionExpression"] == "attribute_not_exists(project_id)"
+        
+        rows = [call.kwargs["Item"] for call in table.batch_writer.return_value.__enter__.return_value.put_item.call_args_list]
+        assert [(row["timestamp"], row["content"]) for row in rows] == [
+            ("20260101_120000#PROJECT SCOPE", "Build an offline editor"),
+            ("20260101_120000#USER STORIES", "Writers draft notes"),
+        ]
+    
+    def test_document_uploaded_to_s3(self):
+        """Test the document goes to S3 and only its URI is stored when a bucket is set"""
+        table = mock.MagicMock()
+        with mock.patch.object(requirements_demo, 'REQUIREMENTS_BUCKET', 'docs-bucket'), \
+             mock.patch.object(requirements_demo, 'get_s3_client') as mock_s3:
+            self._save(table)
+        
+        mock_s3.return_value.put_object.assert_called_once()
+        assert mock_s3.return_value.put_object.call_args.kwargs["Key"] == "requirements/note_app/20260101_120000.md"
+        item = table.put_item.call_args.kwargs["Item"]
+        assert item["s3_uri"] == "s3://docs-bucket/requirements/note_app/20260101_120000.md"
+        assert "document" not in item
+
+
+class TestMain:
+    """Test cases for the command line entry point"""
+    
+    @pytest.fixture
+    def mock_runs(self, monkeypatch):
+        """Fixture to mock the gathering runs and silence output"""
+        result = {"status": "success", "project_name": "Demo", "statistics": {}}
+        with mock.patch.object(requirements_demo, 'gather_requirements', return_value=result) as gather, \
+             mock.patch.object(requirements_demo, 'demo_with_sample_project', return_value=result) as demo, \
+             mock.patch.object(requirements_demo, 'pause_for_reading'), \
+             mock.patch.object(requirements_demo, 'console'):
+            yield gather, demo
+    
+    def _run(self, monkeypatch, *args):
+        monkeypatch.setattr(sys, "argv", ["requirements_demo.py", *args])
+        with pytest.raises(SystemExit) as exit_info:
+            requirements_demo.main()
+        return exit_info.value.code
+    
+    def test_interactive_mode(self, mock_runs, monkeypatch):
+        """Test no arguments runs interactive gathering without the knowledge base"""
+        gather, demo = mock_runs
+        
+        assert self._run(monkeypatch) == 0
+        
+        gather.assert_called_once_with(use_kb=False)
+        demo.assert_not_called()
+    
+    def test_demo_with_kb_id(self, mock_runs, monkeypatch):
+        """Test --demo --kb ID runs the sample project with that knowledge base"""
+        gather, demo = mock_runs
+        monkeypatch.setattr(requirements_demo, "KNOWLEDGE_BASE_ID", requirements_demo.KNOWLEDGE_BASE_ID)
+        
+        self._run(monkeypatch, "--demo", "--kb", "KB123")
+        
+        demo.assert_called_once_with(use_kb=True)
+        assert requirements_demo.KNOWLEDGE_BASE_ID == "KB123"
+    
+    def test_help_and_unknown_arguments(self, mock_runs, monkeypatch):
+        """Test --help and unknown arguments return without gathering"""
+        gather, demo = mock_runs
+        
+        for args in (["--help"], ["--verbose"]):
+            monkeypatch.setattr(sys, "argv", ["requirements_demo.py", *args])
+            with mock.patch.object(requirements_demo, 'print_usage'):
+                requirements_demo.main()
+        
+        gather.assert_not_called()
+        demo.assert_not_called()
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    """Fixture to point the demo's caches at a temporary directory"""
+    with mock.patch.object(requirements_demo, 'CACHE_DIR', str(tmp_path)):
+        yield tmp_path
+
+
+class TestSemanticCache:
+    """Test cases for the two-tier response cache"""
+    
+    def test_exact_match_ignores_case_and_spacing(self, cache_dir):
+        """Test trivially different texts share an entry"""
+        cache = requirements_demo.SemanticCache("test", semantic=False)
+        cache.put("Offline  mode", "value")
+        
+        assert cache.get("offline mode") == "value"
+        assert cache.get("online mode") is None
+    
+    def test_partitions_are_separate(self, cache_dir):
+        """Test one section's result isn't returned for another"""
+        cache = requirements_demo.SemanticCache("test", semantic=False)
+        cache.put("same answer", "scope result", partition="PROJECT SCOPE")
+        
+        assert cache.get("same answer", partition="PROJECT SCOPE") == "scope result"
+        assert cache.get("same answer", partition="USER STORIES") is None
+    
+    def test_entries_persist_to_disk(self, cache_dir):
+        """Test a new cache instance reads earlier entries back"""
+        requirements_demo.SemanticCache("test", semantic=False).put("text", "value")
+        
+        assert requirements_demo.SemanticCache("test", semantic=False).get("text") == "value"
+    
+    def test_expired_entries_miss(self, cache_dir):
+        """Test entries older than the TTL aren't returned"""
+        cache = requirements_demo.SemanticCache("test", ttl=60, semantic=False)
+        with mock.patch.object(requirements_demo.time, 'time', return_value=1000.0):
+            cache.put("text", "value")
+        
+        with mock.patch.object(requirements_demo.time, 'time', return_value=1059.0):
+            assert cache.get("text") == "value"
+        with mock.patch.object(requirements_demo.time, 'time', return_value=1060.0):
+            assert cache.get("text") is None
+    
+    def test_oldest_entries_are_evicted(self, cache_dir):
+        """Test the cache keeps at most max_entries, dropping the oldest"""
+        cache = requirements_demo.SemanticCache("test", semantic=False, max_entries=2)
+        for stored_at, text in enumerate(["first", "second", "third"]):
+            with mock.patch.object(requirements_demo.time, 'time', return_value=float(stored_at)):
+                cache.put(text, text)
+        
+        reloaded = requirements_demo.SemanticCache("test", semantic=False, max_entries=2)
+        assert [reloaded.get(text) for text in ["first", "second", "third"]] == [None, "second", "third"]
+    
+    def test_semantic_match_within_partition(self, cache_dir):
+        """Test similar texts match above the threshold and only within their partition"""
+        embeddings = {"offline mode": [1.0, 0.0], "work offline": [0.99, 0.141], "export reports": [0.0, 1.0]}
+        cache = requirements_demo.SemanticCache("test", threshold=0.95, semantic=True)
+        
+        with mock.patch.object(requirements_demo, 'embed_text', side_effect=embeddings.get) as mock_embed:
+            cache.put("offline mode", "value", partition="PROJECT SCOPE")
+            
+            assert cache.get("work offline", partition="PROJECT SCOPE") == "value"
+            assert cache.get("export reports", partition="PROJECT SCOPE") is None
+            calls_before = mock_embed.call_count
+            assert cache.get("work offline", partition="USER STORIES") is None
+        
+        # Nothing is stored in the other partition, so no embedding is needed
+        assert mock_embed.call_count == calls_before
+    
+    def test_versions_are_separate(self, cache_dir):
+        """Test entries stored under one version aren't served under another"""
+        requirements_demo.SemanticCache("test", semantic=False, version="v1").put("text", "old", partition="S")
+        
+        assert requirements_demo.SemanticCache("test", semantic=False, version="v1").get("text", partition="S") == "old"
+        assert requirements_demo.SemanticCache("test", semantic=False, version="v2").get("text", partition="S") is None
+    
+    def test_tool_cache_versioned_by_prompt_and_model(self, cache_dir, monkeypatch):
+        """Test editing a specialist prompt or switching model stops old tool results being served"""
+        def tool_cache():
+            requirements_demo.get_tool_cache.cache_clear()
+            return requirements_demo.get_tool_cache("evaluate_confidence", "evaluate")
+        
+        tool_cache().put("answer", "Confidence Score: 9/10", partition="PROJECT SCOPE")
+        assert tool_cache().get("answer", partition="PROJECT SCOPE") == "Confidence Score: 9/10"
+        
+        monkeypatch.setitem(requirements_demo.SPECIALIST_PROMPTS, "evaluate", "An edited prompt")
+        assert tool_cache().get("answer", partition="PROJECT SCOPE") is None
+        monkeypatch.undo()
+        
+        monkeypatch.setattr(requirements_demo, "BEDROCK_MODEL_ID", "another-model")
+        assert tool_cache().get("answer", partition="PROJECT SCOPE") is None
+        requirements_demo.get_tool_cache.cache_clear()
+    
+    def test_exact_cache_never_embeds(self, cache_dir):
+        """Test caches without semantic matching make no embedding calls"""
+        cache = requirements_demo.SemanticCache("test", semantic=False)
+        
+        with mock.patch.object(requirements_demo, 'embed_text') as mock_embed:
+            cache.put("text", "value")
+            cache.get("other text")
+        
+        mock_embed.assert_not_called()
+
+
+class TestPrefetchSectionKnowledge:
+    """Test cases for fetching knowledge base context for every section at once"""
+    
+    RESULTS = [
+        {'content': {'text': 'Write user stories around each workflow and use case.'},
+         'documentMetadata': {'source': 'stories.md'}},
+        {'content': {'text': 'Agree acceptance criteria and success metrics early.'},
+         'documentMetadata': {'source': 'criteria.md'}},
+    ]
+    
+    @pytest.fixture(autouse=True)
+    def quiet_console(self, cache_dir):
+        """Fixture to silence console output and give each test an empty cache"""
+        requirements_demo.get_kb_cache.cache_clear()
+        with mock.patch.object(requirements_demo, 'console'):
+            yield
+        requirements_demo.get_kb_cache.cache_clear()
+    
+    def test_results_are_grouped_by_section(self):
+        """Test one retrieval's results are assigned to the sections they match"""
+        with mock.patch.object(requirements_demo, 'retrieve_kb_results', return_value=self.RESULTS) as mock_retrieve:
+            context = requirements_demo.prefetch_section_knowledge("Demo")
+        
+        mock_retrieve.assert_called_once()
+        assert set(context) == set(requirements_demo.SECTION_TITLES)
+        assert "stories.md" in context["USER STORIES"]
+        assert "criteria.md" in context["SUCCESS CRITERIA"]
+        assert context["FILE FORMAT SUPPORT"].startswith("No information found")
+    
+    def test_repeat_prefetch_uses_cache(self):
+        """Test the same project's context is only retrieved once"""
+        with mock.patch.object(requirements_demo, 'retrieve_kb_results', return_value=self.RESULTS) as mock_retrieve:
+            first = requirements_demo.prefetch_section_knowledge("Demo")
+            second = requirements_demo.prefetch_section_knowledge("Demo")
+        
+        mock_retrieve.assert_called_once()
+        assert first == second
+    
+    def test_retrieval_error_fills_every_section(self):
+        """Test a failed retrieval reports the error for each section"""
+        with mock.patch.object(requirements_demo, 'retrieve_kb_results', side_effect=RuntimeError("throttled")):
+            context = requirements_demo.prefetch_section_knowledge("Demo")
+        
+        assert all("throttled" in text for text in context.values())
+        assert len(context) == len(requirements_demo.SECTIONS)
+    
+    def test_off_topic_results_are_dropped(self):
+        """Test results sharing no words with any section don't land in PROJECT SCOPE"""
+        results = [{'content': {'text': 'Lunch menu: soup.'}, 'documentMetadata': {'source': 'menu.md'}}]
+        with mock.patch.object(requirements_demo, 'retrieve_kb_results', return_value=results):
+            context = requirements_demo.prefetch_section_knowledge("Demo")
+        
+        assert all(text.startswith("No information found") for text in context.values())
+    
+    def test_tied_results_are_spread_by_rank(self):
+        """Test results tied between sections fill the emptier section first, best first"""
+        # Each result shares one word with USER STORIES and one with SUCCESS CRITERIA
+        results = [
+            {'content': {'text': 'Track workflows against metrics.'}, 'documentMetadata': {'source': 'best.md'}},
+            {'content': {'text': 'Workflows need metrics too.'}, 'documentMetadata': {'source': 'next.md'}},
+        ]
+        with mock.patch.object(requirements_demo, 'retrieve_kb_results', return_value=results):
+            context = requirements_demo.prefetch_section_knowledge("Demo")
+        
+        assert "best.md" in context["USER STORIES"] and "next.md" not in context["USER STORIES"]
+        assert "next.md" in context["SUCCESS CRITERIA"]
+        assert context["PROJECT SCOPE"].startswith("No information found")
+
+
+class TestSpeculativeValidation:
+    """Test cases for validations started alongside a section's evaluation"""
+    
+    def test_quiet_direct_tool_call_prints_nothing(self):
+        """Test a real Strands direct tool call under run_quietly prints no progress"""
+        from strands import Agent
+        
+        agent = Agent(tools=list(requirements_demo.specialist_tools()), callback_handler=None)
+        cache = mock.MagicMock()
+        cache.get.return_value = None
+        with mock.patch.object(requirements_demo, 'console') as mock_console, \
+             mock.patch.object(requirements_demo, 'ask_specialist', return_value="No issues"), \
+             mock.patch.object(requirements_demo, 'get_tool_cache', return_value=cache):
+            requirements_demo.run_quietly(
+                agent.tool.validate_response,
+                response="We will build an offline note editor",
+                section_name="PROJECT SCOPE",
+                record_direct_tool_call=False
+            )
+            assert mock_console.print.call_count == 0
+            
+            agent.tool.validate_response(
+                response="We will build an offline note editor",
+                section_name="PROJECT SCOPE",
+                record_direct_tool_call=False
+            )
+            assert mock_console.print.call_count > 0
+    
+    @staticmethod
+    def _agent(score, validate):
+        agent = mock.MagicMock()
+        agent.tool.evaluate_confidence.side_effect = lambda **kwargs: f"Confidence Score: {score}/10"
+        agent.tool.validate_response.side_effect = validate
+        return agent
+    
+    def test_high_score_drains_running_validation(self):
+        """Test a passing score waits for a validation already running and drops its result"""
+        started, finished = threading.Event(), threading.Event()
+        
+        def validate(**kwargs):
+            started.set()
+            time.sleep(0.05)
+            finished.set()
+            return "Issues found"
+        
+        agent = self._agent(8, validate)
+        agent.tool.evaluate_confidence.side_effect = lambda **kwargs: started.wait(1) and "Confidence Score: 8/10"
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            result = requirements_demo.assess_section(agent, "PROJECT SCOPE", "answer", executor=executor)
+        
+        assert result == (8.0, None)
+        assert finished.is_set()
+    
+    def test_low_score_reuses_validation(self):
+        """Test a low score takes the speculative validation's result instead of validating again"""
+        agent = self._agent(4, lambda **kwargs: "Issues found")
+        with ThreadPoolExecutor(max_workers=1) as executor, mock.patch.object(requirements_demo, 'console'):
+            result = requirements_demo.assess_section(agent, "PROJECT SCOPE", "answer", executor=executor)
+        
+        assert result == (4.0, "Issues found")
+        agent.tool.validate_response.assert_called_once()
+
+
+class TestLogLevel:
+    """Test cases for the REQ_DEMO_LOG setting, read at import"""
+    
+    @pytest.mark.parametrize("value, expected", [("debug", "DEBUG"), ("verbose", "WARNING")])
+    def test_level_names(self, value, expected):
+        """Test known level names are used and unknown ones fall back to WARNING"""
+        root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+        output = subprocess.run(
+            [sys.executable, "-c", "from src import requirements_demo; print(requirements_demo.LOG_LEVEL)"],
+            cwd=root, env={**os.environ, "REQ_DEMO_LOG": value}, capture_output=True, text=True, check=True
+        ).stdout
+        
+        assert output.strip() == expected
+
+
+class TestStreamDocumentToFile:
+    """Test cases for streaming the revised document to disk"""
+    
+    @staticmethod
+    def _agent(events):
+        """Build a fake agent whose stream_async yields the given events"""
+        async def stream_async(prompt):
+            for event in events:
+                yield event
+        
+        agent = mock.MagicMock()
+        agent.stream_async = stream_async
+        return agent
+    
+    def test_plain_stream_is_not_rewritten(self, tmp_path):
+        """Test the streamed text is kept when no tool was called, even if the result differs"""
+        path = tmp_path / "doc.md"
+        agent = self._agent([{"data": "# Doc\n"}, {"data": "Body"}, {"result": "Something else\n"}])
+        
+        with mock.patch.object(requirements_demo.Path, 'write_text') as mock_write:
+            document = requirements_demo.stream_document_to_file(agent, "prompt", path)
+        
+        mock_write.assert_not_called()
+        assert document == "# Doc\nBody"
+        assert path.read_text(encoding="utf-8") == "# Doc\nBody"
+    
+    def test_tool_call_rewrites_with_final_answer(self, tmp_path):
+        """Test text streamed before a tool call is replaced by the final answer"""
+        path = tmp_path / "doc.md"
+        agent = self._agent([
+            {"data": "Let me check the sections first."},
+            {"current_tool_use": {"name": "generate_requirements_doc"}},
+            {"data": "# Doc\nBody"},
+            {"result": "# Doc\nBody\n"},
+        ])
+        
+        document = requirements_demo.stream_document_to_file(agent, "prompt", path)
+        
+        assert document == "# Doc\nBody\n"
+        assert path.read_text(encoding="utf-8") == "# Doc\nBody\n"
+    
+    def test_whitespace_only_difference_is_not_rewritten(self, tmp_path):
+        """Test a final answer differing only in surrounding whitespace leaves the file alone"""
+        path = tmp_path / "doc.md"
+        agent = self._agent([
+            {"current_tool_use": {"name": "generate_requirements_doc"}},
+            {"data": "# Doc\nBody"},
+            {"result": "\n# Doc\nBody\n"},
+        ])
+        
+        with mock.patch.object(requirements_demo.Path, 'write_text') as mock_write:
+            document = requirements_demo.stream_document_to_file(agent, "prompt", path)
+        
+        mock_write.assert_not_called()
+        assert document == "# Doc\nBody"
+
+
+class TestConcurrentAssessment:
+    """Test cases for assessing every section at once on the shared pools"""
+    
+    class FakeSpecialist:
+        """Stand-in for a Strands specialist agent; every section's call must overlap"""
+        
+        def __init__(self, barrier, scores):
+            self.messages = []
+            self.barrier = barrier
+            self.scores = scores
+        
+        def __call__(self, prompt):
+            section = prompt.split("\n", 1)[0].removeprefix("Section: ")
+            if "Evaluate this" in prompt:
+                # Every section's evaluation waits here, so one borrowed agent or pool slot
+                # held across sections would time out instead of passing
+                self.barrier.wait(timeout=5)
+                # Later sections finish first, so results arrive out of order
+                time.sleep(0.01 * (len(self.scores) - list(self.scores).index(section)))
+                return f"Confidence Score: {self.scores[section]}/10"
+            return f"Missing details for {section}"
+    
+    @pytest.fixture
+    def specialists(self):
+        """Fixture to build fake specialist agents in place of Strands ones"""
+        scores = {title: 8 for title in requirements_demo.SECTION_TITLES}
+        scores["TECHNICAL CONSTRAINTS"] = 4
+        barrier = threading.Barrier(len(scores))
+        
+        cache = mock.MagicMock()
+        cache.get.return_value = None
+        idle_agents = {role: requirements_demo.queue.SimpleQueue() for role in requirements_demo.SPECIALIST_PROMPTS}
+        with mock.patch('strands.Agent', side_effect=lambda **kwargs: self.FakeSpecialist(barrier, scores)) as agent_class, \
+             mock.patch.object(requirements_demo, '_idle_specialist_agents', idle_agents), \
+             mock.patch.object(requirements_demo, 'get_tool_cache', return_value=cache), \
+             mock.patch.object(requirements_demo, 'get_bedrock_model'):
+            yield scores, agent_class
+    
+    @staticmethod
+    def _main_agent():
+        """Build a main agent whose direct tool calls run the demo's tool functions"""
+        agent = mock.MagicMock()
+        agent.tool.evaluate_confidence.side_effect = lambda response, section_name, **kwargs: \
+            requirements_demo.evaluate_confidence(response, section_name)
+        agent.tool.validate_response.side_effect = lambda response, section_name, **kwargs: \
+            requirements_demo.validate_response(response, section_name)
+        return agent
+    
+    @pytest.mark.parametrize("speculative", [False, True])
+    def test_results_reported_in_section_order(self, specialists, speculative):
+        """Test concurrent assessments finish without deadlock and are reported in section order"""
+        scores, agent_class = specialists
+        responses = {title: f"A detailed answer about the {title.lower()} for this project" for title in scores}
+        
+        with mock.patch.object(requirements_demo, 'SPECULATIVE_VALIDATION', speculative), \
+             mock.patch.object(requirements_demo, 'console') as mock_console, \
+             ThreadPoolExecutor(max_workers=1) as runner:
+            confidence_scores, validation_issues = runner.submit(
+                requirements_demo.assess_sections, self._main_agent(), responses
+            ).result(timeout=10)
+        
+        assert list(confidence_scores) == list(scores)
+        assert confidence_scores == {title: float(score) for title, score in scores.items()}
+        assert validation_issues == {"TECHNICAL CONSTRAINTS": "Missing details for TECHNICAL CONSTRAINTS"}
+        
+        reported = [call.args[0] for call in mock_console.print.call_args_list if "Confidence score for" in str(call.args[0])]
+        assert reported == [f"[green]Confidence score for {title}: {score:.1f}/10[/green]" for title, score in scores.items()]
+        # One evaluation agent per concurrent section, plus validation agents; none beyond that
+        assert agent_class.call_count <= 2 * len(scores)
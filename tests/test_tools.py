@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the requirements evaluation and validation tools
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+import threading
+import time
+from unittest import mock
+
+import pytest
+
+# Add the parent directory to the path so we can import the modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.tools import _cache, _parsing, evaluate_confidence, validate_response
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    """Fixture to point the tool result cache at a temporary directory"""
+    with mock.patch.object(_cache, 'CACHE_DIR', tmp_path):
+        yield tmp_path
+
+
+class TestResultCache:
+    """Test cases for the on-disk tool result cache"""
+    
+    def test_read_miss(self, cache_dir):
+        """Test reading a key that was never written returns None"""
+        assert _cache.read_result("eval", _cache.content_key("prompt", "section", "response")) is None
+    
+    def test_write_then_read(self, cache_dir):
+        """Test a written result is read back and no temporary file is left behind"""
+        key = _cache.content_key("prompt", "section", "response")
+        
+        _cache.write_result("eval", key, '{"confidence_score": 8}')
+        
+        assert _cache.read_result("eval", key) == '{"confidence_score": 8}'
+        assert [path.name for path in (cache_dir / "eval").iterdir()] == [f"{key}.json"]
+    
+    def test_failed_write_keeps_previous_result(self, cache_dir):
+        """Test a write that fails part way leaves the earlier result intact"""
+        key = _cache.content_key("prompt", "section", "response")
+        _cache.write_result("eval", key, "first")
+        
+        with mock.patch.object(_cache.os, 'replace', side_effect=OSError("disk full")):
+            _cache.write_result("eval", key, "second")
+        
+        assert _cache.read_result("eval", key) == "first"
+        assert [path.name for path in (cache_dir / "eval").iterdir()] == [f"{key}.json"]
+    
+    def test_expired_result_is_a_miss(self, cache_dir):
+        """Test results older than the TTL aren't returned"""
+        key = _cache.content_key("prompt", "section", "response")
+        _cache.write_result("eval", key, "stale")
+        old = time.time() - _cache.CACHE_TTL - 1
+        os.utime(cache_dir / "eval" / f"{key}.json", (old, old))
+        
+        assert _cache.read_result("eval", key) is None
+    
+    @pytest.mark.parametrize("value, expected", [("60", 60.0), ("a week", _cache.DEFAULT_CACHE_TTL)])
+    def test_ttl_setting(self, value, expected):
+        """Test REQUIREMENTS_CACHE_TTL is read at import, falling back to the default"""
+        root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+        output = subprocess.run(
+            [sys.executable, "-c", "from src.tools import _cache; print(_cache.CACHE_TTL)"],
+            cwd=root, env={**os.environ, "REQUIREMENTS_CACHE_TTL": value}, capture_output=True, text=True, check=True
+        ).stdout
+        
+        assert float(output) == expected
+    
+    def test_key_depends_on_every_part(self):
+        """Test the prompt and the model version are part of the key"""
+        key = _cache.content_key("prompt", "section", "response")
+        
+        assert key == _cache.content_key("prompt", "section", "response")
+        assert key != _cache.content_key("edited prompt", "section", "response")
+        with mock.patch.object(_cache, '_MODEL_VERSION', 'next'):
+            assert key != _cache.content_key("prompt", "section", "response")
+
+
+class TestJsonParsing:
+    """Test cases for pulling JSON out of agent replies"""
+    
+    def test_object_in_prose(self):
+        """Test an object wrapped in prose and a code fence is parsed"""
+        text = 'Here is my evaluation:\n```json\n{"confidence_score": 7.5, "strengths": ["clear"]}\n```\nThanks!'
+        
+        assert _parsing.parse_json_object(text, {}) == {"confidence_score": 7.5, "strengths": ["clear"]}
+    
+    def test_first_of_two_objects(self):
+        """Test only the first of several objects is parsed"""
+        text = '{"section": "A", "score": 1} and then {"section": "B", "score": 2}'
+        
+        assert _parsing.parse_json_object(text, {}) == {"section": "A", "score": 1}
+    
+    def test_skips_braces_that_are_not_json(self):
+        """Test stray braces before the object are skipped"""
+        text = 'Using {section_name} as given: {"issues_found": true}'
+        
+        assert _parsing.parse_json_object(text, {}) == {"issues_found": True}
+    
+    def test_nested_object(self):
+        """Test nested objects are returned whole"""
+        text = 'Result: {"outer": {"inner": 1}, "after": 2}'
+        
+        assert _parsing.parse_json_object(text, {}) == {"outer": {"inner": 1}, "after": 2}
+    
+    def test_object_default_is_copied(self):
+        """Test unparseable replies return a fresh copy of the default"""
+        default = {"issues_found": False}
+        
+        parsed = _parsing.parse_json_object("No JSON here", default)
+        parsed["issues_found"] = True
+        
+        assert default == {"issues_found": False}
+    
+    def test_arrays(self):
+        """Test the first array is parsed and a missing one gives an empty list"""
+        text = 'Scores [see below]: [{"section": "A"}, {"section": "B"}] and [1, 2]'
+        
+        assert _parsing.parse_json_array(text) == [{"section": "A"}, {"section": "B"}]
+        assert _parsing.parse_json_array("nothing") == []
+
+
+@pytest.fixture
+def mock_agent():
+    """Fixture to mock the tools' Strands agents, building fresh cached agents around the mock"""
+    with mock.patch.object(evaluate_confidence, 'Agent') as eval_agent, \
+         mock.patch.object(validate_response, 'Agent', new=eval_agent):
+        for cached in (evaluate_confidence._get_eval_agent, evaluate_confidence._get_batch_eval_agent,
+                       validate_response._get_validation_agent):
+            cached.cache_clear()
+        yield eval_agent.return_value
+
+
+class TestTools:
+    """Test cases for the evaluation and validation tools"""
+    
+    def test_evaluate_calls_agent(self, cache_dir, mock_agent):
+        """Test the agent is called directly and its JSON reply parsed"""
+        mock_agent.return_value = 'Evaluation: {"confidence_score": 6, "feedback": "ok"}'
+        
+        result = evaluate_confidence.evaluate_confidence("Some response", "PROJECT SCOPE")
+        
+        mock_agent.assert_called_once()
+        assert result["confidence_score"] == 6
+        assert result["raw_response"] == 'Evaluation: {"confidence_score": 6, "feedback": "ok"}'
+    
+    def test_validate_defaults_keep_reply(self, cache_dir, mock_agent):
+        """Test a reply without JSON gives the defaults plus the raw text"""
+        mock_agent.return_value = "Looks complete to me."
+        
+        result = validate_response.validate_response("Some response", "USER STORIES")
+        
+        assert result["issues_found"] is False
+        assert result["raw_response"] == "Looks complete to me."
+    
+    def test_results_are_cached_on_disk(self, cache_dir, mock_agent):
+        """Test a repeat request is answered from disk"""
+        mock_agent.return_value = '{"issues_found": true}'
+        validate_response.validate_response("Some response", "USER STORIES")
+        
+        result = validate_response.validate_response("Some response", "USER STORIES")
+        
+        mock_agent.assert_called_once()
+        assert result["issues_found"] is True
+    
+    def test_expired_results_are_recomputed(self, cache_dir, mock_agent):
+        """Test a result past the TTL is evaluated again in the same process"""
+        mock_agent.return_value = '{"confidence_score": 6}'
+        evaluate_confidence.evaluate_confidence("Some response", "PROJECT SCOPE")
+        
+        with mock.patch.object(_cache.time, 'time', return_value=time.time() + _cache.CACHE_TTL + 1):
+            evaluate_confidence.evaluate_confidence("Some response", "PROJECT SCOPE")
+        
+        assert mock_agent.call_count == 2
+
+
+class TestBatchEvaluation:
+    """Test cases for evaluating several sections in one call"""
+    
+    PAIRS = [("PROJECT SCOPE", "Scope answer"), ("USER STORIES", "Stories answer")]
+    
+    def test_matches_by_section_name(self, cache_dir, mock_agent):
+        """Test out-of-order replies are matched to their sections, not their positions"""
+        mock_agent.return_value = ('[{"section": "USER STORIES", "confidence_score": 4}, '
+                                   '{"section": "PROJECT SCOPE", "confidence_score": 9}]')
+        
+        results = evaluate_confidence.evaluate_confidence_batch(self.PAIRS)
+        
+        assert [(r["section"], r["confidence_score"]) for r in results] == [
+            ("PROJECT SCOPE", 9), ("USER STORIES", 4)
+        ]
+        mock_agent.assert_called_once()
+    
+    def test_unnamed_items_match_by_position(self, cache_dir, mock_agent):
+        """Test items without a section name fall back to position and get the default keys"""
+        mock_agent.return_value = '[{"confidence_score": 9}, {"confidence_score": 4}]'
+        
+        results = evaluate_confidence.evaluate_confidence_batch(self.PAIRS)
+        
+        assert results[0] == {
+            "confidence_score": 9, "feedback": "", "strengths": [], "weaknesses": [], "section": "PROJECT SCOPE"
+        }
+        assert results[1]["section"] == "USER STORIES"
+        assert results[1]["confidence_score"] == 4
+    
+    def test_missing_section_evaluated_alone(self, cache_dir, mock_agent):
+        """Test a section the reply names wrongly is evaluated with a single call"""
+        mock_agent.side_effect = [
+            '[{"section": "PROJECT SCOPE", "confidence_score": 9}, {"section": "OTHER", "confidence_score": 1}]',
+            '{"confidence_score": 5}',
+        ]
+        
+        results = evaluate_confidence.evaluate_confidence_batch(self.PAIRS)
+        
+        assert [r["confidence_score"] for r in results] == [9, 5]
+        assert results[1]["section"] == "USER STORIES"
+        assert mock_agent.call_count == 2
+
+
+class TestAsyncTools:
+    """Test cases for the awaitable tool wrappers"""
+    
+    def test_gathered_evaluations(self, cache_dir, mock_agent):
+        """Test several evaluations can be awaited together and keep their order"""
+        mock_agent.side_effect = lambda prompt: '{"confidence_score": %d}' % (9 if "Scope" in prompt else 4)
+        
+        async def run():
+            return await asyncio.gather(
+                evaluate_confidence.evaluate_confidence_async("Scope answer", "PROJECT SCOPE"),
+                evaluate_confidence.evaluate_confidence_async("Stories answer", "USER STORIES"),
+            )
+        
+        results = asyncio.run(run())
+        
+        assert [(r["section"], r["confidence_score"]) for r in results] == [("PROJECT SCOPE", 9), ("USER STORIES", 4)]
+    
+    def test_validation_runs_off_the_event_loop(self, cache_dir, mock_agent):
+        """Test the blocking validation runs in a worker thread, not on the loop's thread"""
+        threads = []
+        
+        def reply(prompt):
+            threads.append(threading.current_thread())
+            return '{"issues_found": true}'
+        
+        mock_agent.side_effect = reply
+        
+        result = asyncio.run(validate_response.validate_response_async("Some response", "USER STORIES"))
+        
+        assert result["issues_found"] is True
+        assert threads and threads[0] is not threading.main_thread()